@@ -0,0 +1,262 @@
+import threading
+import collections
+import Queue
+import sys
+import xtremParallelLib
+from xtremWrapper import XtremIO
+
+# Worker threads shared by every AsyncXtremIO using the default dispatcher
+DEFAULT_WORKERS = 64
+
+class XtremFuture(object):
+    """ Result of a request submitted to an XtremDispatcher """
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._exc_info = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def done(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """ Waits for and returns the result, re-raising any exception
+            raised by the request """
+        if not self._done.wait(timeout):
+            raise RuntimeError("Timed out waiting for XtremIO request")
+        if self._exc_info is not None:
+            exc_type, exc_value, exc_tb = self._exc_info
+            raise exc_type, exc_value, exc_tb
+        return self._result
+
+    def exception(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise RuntimeError("Timed out waiting for XtremIO request")
+        if self._exc_info is not None:
+            return self._exc_info[1]
+        return None
+
+    def add_done_callback(self, func):
+        """ Calls func(future) once the request completes, straight away
+            if it already has """
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(func)
+                return
+        func(self)
+
+    def _set_result(self, result):
+        self._finish(result, None)
+
+    def _set_exception(self, exc_info):
+        self._finish(None, exc_info)
+
+    def _finish(self, result, exc_info):
+        # Only the first outcome counts
+        with self._lock:
+            if self._done.is_set():
+                return
+            self._result = result
+            self._exc_info = exc_info
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for func in callbacks:
+            func(self)
+
+class XtremDispatcher(object):
+    """ One pool of worker threads that runs requests for any number of
+        XMS, each request holding a slot of its XMS concurrency limiter.
+        Requests are only handed to a worker once their slot is taken.
+        Those for an XMS at its limit wait in a queue of their own, so a
+        slow or limited XMS never holds workers that other XMS could use """
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.workers = workers
+        self._queue = Queue.Queue()
+        self._parked = dict()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, ip, func, *args, **kwargs):
+        """ Queues func(*args, **kwargs) against the XMS at ip, returning
+            an XtremFuture for its result """
+        self._start()
+        future = XtremFuture()
+        job = (ip, future, func, args, kwargs)
+        with self._lock:
+            parked = self._parked.get(ip)
+            # Jobs already waiting on the XMS keep their turn
+            if parked:
+                parked.append(job)
+                return future
+            if not self._take_slot(ip):
+                self._parked.setdefault(ip, collections.deque()).append(job)
+                return future
+        self._queue.put(job)
+        return future
+
+    def parked(self, ip=None):
+        """ Number of jobs waiting for a slot, for one XMS or all """
+        with self._lock:
+            return sum(len(jobs) for key, jobs in self._parked.items()
+                       if ip is None or key == ip)
+
+    def _take_slot(self, ip):
+        return xtremParallelLib.getLimiter(ip).acquire_or_notify(
+            lambda: self._unpark(ip))
+
+    def _unpark(self, ip):
+        """ Hands parked jobs of the XMS to the workers while it has free
+            slots """
+        ready = []
+        with self._lock:
+            parked = self._parked.get(ip)
+            while parked and self._take_slot(ip):
+                ready.append(parked.popleft())
+            if not parked:
+                self._parked.pop(ip, None)
+        for job in ready:
+            self._queue.put(job)
+
+    def _start(self):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            ip, future, func, args, kwargs = self._queue.get()
+            # The slot was taken when the job was queued, and is held by
+            # this thread so the job's own requests do not take another
+            try:
+                with xtremParallelLib.getLimiter(ip).adopt():
+                    result = func(*args, **kwargs)
+            except Exception:
+                future._set_exception(sys.exc_info())
+            else:
+                future._set_result(result)
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def getDispatcher():
+    """ Returns the dispatcher shared by all AsyncXtremIO instances """
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = XtremDispatcher()
+        return _dispatcher
+
+def as_completed(futures, timeout=None):
+    """ Yields futures in the order they complete """
+    done = Queue.Queue()
+    futures = list(futures)
+    for future in futures:
+        future.add_done_callback(done.put)
+    for i in range(len(futures)):
+        try:
+            yield done.get(timeout=timeout)
+        except Queue.Empty:
+            raise RuntimeError("Timed out waiting for XtremIO requests")
+
+class AsyncXtremIO(XtremIO):
+    """ XtremIO connection whose requests can be issued without blocking.
+        Requests from every AsyncXtremIO go through one shared dispatcher,
+        so a single caller can keep requests in flight on many arrays.
+        Objects are built by the same XtremObjFactory as XtremIO """
+
+    def __init__(self, ip, user, pwd, dispatcher=None, **kwargs):
+        XtremIO.__init__(self, ip, user, pwd, **kwargs)
+        self.dispatcher = dispatcher or getDispatcher()
+
+    def __repr__(self):
+        return "<AsyncXtremIO IP: %s>" % self.ip
+
+    def get_details_async(self, device_object, **kwargs):
+        return self.dispatcher.submit(self.ip, self._get_details,
+                                      device_object, **kwargs)
+
+    def get_objects_async(self, object_type, **kwargs):
+        """ Returns an XtremFuture for the list of XtremObjects of
+            object_type.  The list request and each detail request are
+            separate jobs, so no worker waits on another """
+        future = XtremFuture()
+        objects_future = self._list_async(object_type, kwargs)
+        fetch = self._wants_details(kwargs)
+
+        def listed(listing):
+            if listing.exception() is not None:
+                future._set_exception(listing._exc_info)
+                return
+            objects = listing.result()
+            if objects == 1 or not fetch or not objects:
+                future._set_result(objects)
+                return
+
+            remaining = [len(objects)]
+            lock = threading.Lock()
+
+            def fetched(detail):
+                if detail.exception() is not None:
+                    future._set_exception(detail._exc_info)
+                with lock:
+                    remaining[0] -= 1
+                    finished = remaining[0] == 0
+                if finished:
+                    future._set_result(objects)
+
+            for obj in objects:
+                self._load_async(obj).add_done_callback(fetched)
+
+        objects_future.add_done_callback(listed)
+        return future
+
+    def iter_objects_async(self, object_type, **kwargs):
+        """ Yields XtremObjects of object_type as their details arrive,
+            rather than in list order """
+        fetch = self._wants_details(kwargs)
+        objects = self._list_async(object_type, kwargs).result()
+        if objects == 1:
+            return
+        if not fetch:
+            for obj in objects:
+                yield obj
+            return
+
+        futures = dict()
+        for obj in objects:
+            futures[self._load_async(obj)] = obj
+        for future in as_completed(futures.keys()):
+            future.result()
+            yield futures[future]
+
+    def collection_async(self, parent, object_type, **kwargs):
+        """ Async counterpart of the collection properties, e.g.
+            collection_async(cluster, "volumes") """
+        kwargs.update(parent._query_filters())
+        return self.get_objects_async(object_type, **kwargs)
+
+    def iter_collection_async(self, parent, object_type, **kwargs):
+        kwargs.update(parent._query_filters())
+        return self.iter_objects_async(object_type, **kwargs)
+
+    def _wants_details(self, kwargs):
+        full = kwargs.get("full")
+        if full is None:
+            full = self.bulk
+        return not full and not kwargs.get("lazy", self.lazy)
+
+    def _list_async(self, object_type, kwargs):
+        """ Submits the list request, building objects lazily so their
+            details can be fetched as separate jobs """
+        kwargs = dict(kwargs, lazy=True, workers=1)
+        return self.dispatcher.submit(self.ip, self._get_objects,
+                                      object_type, **kwargs)
+
+    def _load_async(self, device_object):
+        return self.dispatcher.submit(self.ip, lambda: device_object.initial_object_details)
@@ -0,0 +1,235 @@
+import calendar
+import fnmatch
+import time
+import xtremOperationsLib
+import xtremParallelLib
+
+# Requests submitted at once by the bulk functions, further capped by the
+# XMS concurrency limit in xtremParallelLib
+DEFAULT_WORKERS = 8
+
+def _failed(result):
+    """ The operations functions return 1 on a connection error, and the
+        XMS returns a message instead of links when a request is refused """
+    return result == 1 or (isinstance(result, dict) and 'message' in result)
+
+def _error(result):
+    if isinstance(result, dict):
+        return result.get('message')
+    return result
+
+def _attempt(func, *args):
+    """ Calls an operations function, turning anything it raises, such as
+        the ValueError of a reply that is not JSON, into a failed result so
+        one bad reply does not abort the rest of a batch """
+    try:
+        return func(*args)
+    except Exception as e:
+        return {'message':'%s: %s' % (type(e).__name__, e)}
+
+#Provisioning
+def provisionVolumes(ip,user,pwd,specs,workers=DEFAULT_WORKERS):
+    """ Creates many volumes, adds them to their consistency groups and maps
+        them to their initiator groups, each step in parallel.  specs is a
+        list of dicts with 'name', 'size' and optionally 'cg' and 'igs' (a
+        list of initiator group names).  Volume creates all run first, then
+        the CG adds and lun maps of the volumes that were created.
+
+        Returns one result dict per spec, in order, with 'name', 'ok',
+        'created', 'cg', 'mapped', 'errors' and 'elapsed', the seconds
+        from the start of the batch until the volume's last step finished """
+    started = time.time()
+    results = [{'name':spec['name'],
+                'ok':False,
+                'created':False,
+                'cg':None,
+                'mapped':[],
+                'errors':[],
+                'elapsed':None} for spec in specs]
+
+    def create(i):
+        spec = specs[i]
+        result = _attempt(xtremOperationsLib.createVolume,ip,user,pwd,spec['name'],spec['size'])
+        return result, time.time() - started
+
+    created = xtremParallelLib.parallelMap(create, range(len(specs)), workers, ip=ip)
+    for i, (result, finished) in enumerate(created):
+        results[i]['elapsed'] = finished
+        if _failed(result):
+            results[i]['errors'].append(('create', _error(result)))
+        else:
+            results[i]['created'] = True
+
+    # CG membership and lun maps only depend on the volume existing
+    tasks = []
+    for i, spec in enumerate(specs):
+        if not results[i]['created']:
+            continue
+        if spec.get('cg'):
+            tasks.append((i, 'cg', spec['cg']))
+        for igname in spec.get('igs') or []:
+            tasks.append((i, 'map', igname))
+
+    def attach(task):
+        i, kind, target = task
+        if kind == 'cg':
+            result = _attempt(xtremOperationsLib.addVolumeToCG,ip,user,pwd,target,specs[i]['name'])
+        else:
+            result = _attempt(xtremOperationsLib.addLunMapping,ip,user,pwd,specs[i]['name'],target)
+        return result, time.time() - started
+
+    attached = xtremParallelLib.parallelMap(attach, tasks, workers, ip=ip)
+    for (i, kind, target), (result, finished) in zip(tasks, attached):
+        results[i]['elapsed'] = max(results[i]['elapsed'], finished)
+        if _failed(result):
+            results[i]['errors'].append((kind, _error(result)))
+        elif kind == 'cg':
+            results[i]['cg'] = target
+        else:
+            results[i]['mapped'].append(target)
+
+    for result in results:
+        result['ok'] = result['created'] and not result['errors']
+
+    return results
+
+#Cleanup
+def _matches(snapshot,pattern,older_than,tag,parent_volume,now):
+    if pattern is not None and not fnmatch.fnmatchcase(snapshot.get('name',''),pattern):
+        return False
+    if parent_volume is not None:
+        ancestor = snapshot.get('ancestor-vol-id') or [None,None,None]
+        if ancestor[1] != parent_volume:
+            return False
+    if tag is not None:
+        tags = [t[1] for t in snapshot.get('tag-list') or []]
+        if not [t for t in tags if t == tag or t.endswith('/' + tag)]:
+            return False
+    if older_than is not None:
+        try:
+            created = calendar.timegm(time.strptime(snapshot.get('creation-time'),
+                                                    '%Y-%m-%d %H:%M:%S'))
+        except (TypeError, ValueError):
+            return False
+        if now - created < older_than:
+            return False
+    return True
+
+def planSnapshotCleanup(ip,user,pwd,pattern=None,older_than=None,tag=None,
+                        parent_volume=None):
+    """ Works out what cleanupSnapshots would remove, from one listing each
+        of snapshots, snapshot sets and lun maps.  Snapshots are selected by
+        name glob pattern, age in seconds (creation-time taken as UTC), tag
+        name and parent volume name; all given selectors must match.
+
+        Returns {'unmap':[lun map indexes], 'snapshot_sets':[names],
+        'snapshots':[names]}, where a snapshot set is listed instead of its
+        snapshots when all of them are selected, or 1 on error.  'mapped'
+        gives the snapshot name of each lun map to remove and 'members'
+        the snapshot names of each snapshot set """
+    snapshots = xtremOperationsLib.getFullList(ip,user,pwd,'snapshots',
+        props=['name','index','creation-time','ancestor-vol-id','tag-list'])
+    if snapshots == 1:
+        return 1
+
+    now = time.time()
+    selected = set(snap['name'] for snap in snapshots
+                   if _matches(snap,pattern,older_than,tag,parent_volume,now))
+    plan = {'unmap':[], 'snapshot_sets':[], 'snapshots':[],
+            'mapped':{}, 'members':{}}
+    if not selected:
+        return plan
+
+    snapshot_sets = xtremOperationsLib.getFullList(ip,user,pwd,'snapshot-sets',
+                                                   props=['name','index','vol-list'])
+    lunmaps = xtremOperationsLib.getFullList(ip,user,pwd,'lun-maps',
+                                             props=['index','vol-name'])
+    if snapshot_sets == 1 or lunmaps == 1:
+        return 1
+
+    covered = set()
+    for snapshot_set in snapshot_sets:
+        members = set(vol[1] for vol in snapshot_set.get('vol-list') or [])
+        if members and members <= selected:
+            plan['snapshot_sets'].append(snapshot_set['name'])
+            plan['members'][snapshot_set['name']] = sorted(members)
+            covered |= members
+    plan['snapshots'] = sorted(selected - covered)
+    for lunmap in lunmaps:
+        if lunmap.get('vol-name') in selected:
+            plan['unmap'].append(lunmap['index'])
+            plan['mapped'][lunmap['index']] = lunmap['vol-name']
+    return plan
+
+def cleanupSnapshots(ip,user,pwd,pattern=None,older_than=None,tag=None,
+                     parent_volume=None,dry_run=True,workers=DEFAULT_WORKERS):
+    """ Deletes the snapshots picked by the selectors of planSnapshotCleanup.
+        Their lun maps are removed first, then whole snapshot sets and the
+        remaining snapshots are deleted, each step in parallel.  Snapshots
+        with a lun map that could not be removed are not deleted, nor are
+        snapshot sets holding one.  With dry_run (the default) nothing is
+        deleted and only the plan is returned.
+
+        Returns the plan with a 'results' list of dicts holding 'kind',
+        'target' and 'status' (0 on success), or 1 on error.  Deletes
+        skipped for a failed unmap have status 1 and 'skipped' set """
+    plan = planSnapshotCleanup(ip,user,pwd,pattern,older_than,tag,parent_volume)
+    if plan == 1:
+        return 1
+    plan['dry_run'] = dry_run
+    plan['results'] = []
+    if dry_run:
+        return plan
+
+    def unmap(index):
+        return xtremOperationsLib.deleteLunMapping(ip,user,pwd,index)
+
+    def delete(task):
+        kind, name = task
+        if kind == 'snapshot_set':
+            return xtremOperationsLib.deleteSnapshotSet(ip,user,pwd,name)
+        return xtremOperationsLib.deleteSnapshot(ip,user,pwd,name)
+
+    statuses = xtremParallelLib.parallelMap(unmap, plan['unmap'], workers, ip=ip)
+    still_mapped = set()
+    for index, status in zip(plan['unmap'], statuses):
+        plan['results'].append({'kind':'unmap', 'target':index, 'status':status})
+        if status != 0:
+            still_mapped.add(plan['mapped'][index])
+
+    tasks = []
+    candidates = ([('snapshot_set', name) for name in plan['snapshot_sets']] +
+                  [('snapshot', name) for name in plan['snapshots']])
+    for kind, name in candidates:
+        members = plan['members'][name] if kind == 'snapshot_set' else [name]
+        if still_mapped.intersection(members):
+            plan['results'].append({'kind':kind, 'target':name, 'status':1,
+                                    'skipped':True})
+        else:
+            tasks.append((kind, name))
+    statuses = xtremParallelLib.parallelMap(delete, tasks, workers, ip=ip)
+    for (kind, name), status in zip(tasks, statuses):
+        plan['results'].append({'kind':kind, 'target':name, 'status':status})
+
+    return plan
+
+#Refresh
+def refreshSnapshots(ip,user,pwd,refreshes,workers=DEFAULT_WORKERS,no_backup=True):
+    """ Refreshes many targets in parallel, one refresh call per target.
+        refreshes is a list of dicts with 'source', 'target' and optionally
+        'type' ('consistency-group' by default, 'snapshot-set' or 'volume').
+
+        Returns one result dict per refresh, in order, with 'source',
+        'target', 'ok', 'error' and 'elapsed', the seconds the call took """
+
+    def refresh(item):
+        started = time.time()
+        result = xtremOperationsLib.refreshSnapshot(ip,user,pwd,item['source'],item['target'],
+                                                    item.get('type','consistency-group'),no_backup)
+        return {'source':item['source'],
+                'target':item['target'],
+                'ok':not _failed(result),
+                'error':_error(result) if _failed(result) else None,
+                'elapsed':time.time() - started}
+
+    return xtremParallelLib.parallelMap(refresh, refreshes, workers, ip=ip)
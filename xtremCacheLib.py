@@ -0,0 +1,115 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = 30
+DEFAULT_MAX_ENTRIES = 10000
+
+_caches = dict()
+_caches_lock = threading.Lock()
+
+class XtremCache(object):
+    """ Size bounded LRU cache of responses from one XMS.  Entries expire
+        after ttl seconds and are tagged with their object type so they
+        can be dropped when objects of that type are changed """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """ Returns (True, value) on a hit, (False, None) on a miss """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                expires, object_type, value = entry
+                if expires > time.time():
+                    self._entries[key] = entry
+                    self.hits += 1
+                    return True, value
+                self.expired += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value, object_type=None):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + self.ttl, object_type, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *object_types):
+        """ Drops the entries of the given object types, or everything
+            when no types are given """
+        with self._lock:
+            if not object_types:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                return
+            for key, entry in list(self._entries.items()):
+                if entry[1] in object_types:
+                    del self._entries[key]
+                    self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {'entries':len(self._entries),
+                    'ttl':self.ttl,
+                    'max_entries':self.max_entries,
+                    'hits':self.hits,
+                    'misses':self.misses,
+                    'expired':self.expired,
+                    'evictions':self.evictions,
+                    'invalidations':self.invalidations}
+
+def paramsKey(params):
+    """ Turns a request params dict into something usable in a cache key """
+    if not params:
+        return ()
+    return tuple(sorted((key, repr(val)) for key, val in params.items()))
+
+def userKey(user,pwd):
+    """ Identifies the credentials a response was fetched with, so cached
+        responses are only handed back to the same user and password """
+    return hashlib.sha256('%s\0%s' % (user, pwd)).hexdigest()
+
+def enableCache(ip,ttl=DEFAULT_TTL,max_entries=DEFAULT_MAX_ENTRIES):
+    """ Turns on response caching for an XMS, returning its cache """
+    with _caches_lock:
+        cache = _caches.get(ip)
+        if cache is None:
+            cache = XtremCache(ttl, max_entries)
+            _caches[ip] = cache
+        else:
+            cache.ttl = ttl
+            cache.max_entries = max_entries
+        return cache
+
+def disableCache(ip):
+    with _caches_lock:
+        _caches.pop(ip, None)
+
+def getCache(ip):
+    """ Returns the cache for an XMS, or None if caching is not enabled """
+    return _caches.get(ip)
+
+def invalidate(ip,*object_types):
+    """ Drops cached responses for the object types changed on an XMS """
+    cache = _caches.get(ip)
+    if cache is not None:
+        cache.invalidate(*object_types)
+
+def getCacheStats(ip=None):
+    with _caches_lock:
+        items = list(_caches.items())
+    return dict((key, cache.stats()) for key, cache in items
+                if ip is None or key == ip)
@@ -1,5 +1,6 @@
 import requests, json, sys
 import requests.packages.urllib3
+import xtremRequestLib
 
 requests.packages.urllib3.disable_warnings()
 #Utility Functions
@@ -11,204 +12,84 @@ def getResponseStatus(response):
 
 #Cluster APIs
 def getClusters(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/clusters/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/clusters/'%(ip))
 
 def getClusterDetails(ip,user,pwd,clusterName):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/clusters?name=%s'%(ip,clusterName),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/clusters?name=%s'%(ip,clusterName))
 
 #X-Brick APIs
 def getXbricks(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/bricks/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/bricks/'%(ip))
 
 def getXbrickDetails(ip,user,pwd,brickId):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/bricks?brick-id=%s'%(ip,brickId),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/bricks?brick-id=%s'%(ip,brickId))
 
 #SSD APIs
 def getSsds(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/ssds/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/ssds/'%(ip))
 
 def getSsdDetails(ip,user,pwd,ssdId):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/ssds?name=%s'%(ip,ssdId),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/ssds?name=%s'%(ip,ssdId))
 
 #slots API
 def getSlots(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/slots/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/slots/'%(ip))
 
 def getSlotDetails(ip,user,pwd,slotId):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/slots?slot-id=%s'%(ip,slotId),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/slots?slot-id=%s'%(ip,slotId))
 
 #BBU API
 def getBbus(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/bbus/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/bbus/'%(ip))
 
 def getBbuDetails(ip,user,pwd,bbuId):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/bbus?bbu-id=%s'%(ip,bbuId),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/bbus?bbu-id=%s'%(ip,bbuId))
 
 #IB switch API
 def getIbSwitches(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/infiniband-switches/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/infiniband-switches/'%(ip))
 
 def getIbSwitchDetails(ip,user,pwd,ibId):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/infiniband-switches?infiniband-switch-id=%s'%(ip,ibId),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/infiniband-switches?infiniband-switch-id=%s'%(ip,ibId))
 
 #DAE API
 def getDaes(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/daes/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/daes/'%(ip))
 
 def getDaeDetails(ip,user,pwd,daeId):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/daes?dae-id=%s'%(ip,daeId),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/daes?dae-id=%s'%(ip,daeId))
 
 #DAE Controller API
 def getDaeControllers(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/dae-controllers/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/dae-controllers/'%(ip))
 
 def getDaeControllerDetails(ip,user,pwd,daeContollerId):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/dae-controllers?dae-controllers-id=%s'%(ip,daeControllerId),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/dae-controllers?dae-controllers-id=%s'%(ip,daeControllerId))
 
 #DAE PSU API
 def getDaePsus(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/dae-psus/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/dae-psus/'%(ip))
 
 def getDaePsuDetails(ip,user,pwd,daePsuId):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/dae-psus?dae-psus-id=%s'%(ip,daePsuId),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/dae-psus?dae-psus-id=%s'%(ip,daePsuId))
 
 #local-disks
 def getLocalDisks(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/local-disks/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/local-disks/'%(ip))
 
 def getLocalDiskDetails(ip,user,pwd,localDiskId):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/local-disks?local-disk-id=%s'%(ip,ocalDiskId),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/local-disks?local-disk-id=%s'%(ip,ocalDiskId))
 
 #Storage controller API
 def getStorageContollers(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/storage-controllers/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/storage-controllers/'%(ip))
 
 def getStorageControllerDetails(ip,user,pwd,name):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/storage-controllers?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/storage-controllers?name=%s'%(ip,name))
 
 #Storage controller PSUs
 def getStorageContollerPsus(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/storage-controller-psus/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/storage-controller-psus/'%(ip))
 
 def getStorageControllerPsuDetails(ip,user,pwd,scPsuName):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/storage-controller-psus?name=%s'%(ip,scPsuName),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/storage-controller-psus?name=%s'%(ip,scPsuName))
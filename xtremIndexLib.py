@@ -0,0 +1,171 @@
+import threading
+import time
+import requests, json
+import requests.packages.urllib3
+import xtremRequestLib
+import xtremOperationsLib
+import xtremCacheLib
+
+requests.packages.urllib3.disable_warnings()
+
+# Seconds before an index is rebuilt from a fresh listing
+DEFAULT_TTL = 300
+
+_indexes = dict()
+_indexes_lock = threading.Lock()
+
+class XtremNameIndex(object):
+    """ name <-> index <-> href lookup for one object type on one XMS.
+        Built from one bulk listing, then kept current by adding objects
+        as they are looked up or created and dropping them when deleted """
+
+    def __init__(self, ip, user, pwd, objtype, ttl=DEFAULT_TTL):
+        self.ip = ip
+        self.user = user
+        self.pwd = pwd
+        self.objtype = objtype
+        self.ttl = ttl
+        self.loaded = None
+        self.lookups = 0
+        self.misses = 0
+        self._by_name = dict()
+        self._by_index = dict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def __repr__(self):
+        return "<XtremNameIndex: %s %s, %d names>" % (self.ip, self.objtype,
+                                                       len(self._by_name))
+
+    def _url(self):
+        return 'https://%s/api/json/v2/types/%s'%(self.ip,self.objtype)
+
+    def load(self):
+        """ Rebuilds the index from one listing of names and indexes """
+        entries = xtremOperationsLib.getFullList(self.ip,self.user,self.pwd,
+                                                 self.objtype,props=['name','index'])
+        if entries == 1:
+            return 1
+        with self._lock:
+            self._by_name = dict()
+            self._by_index = dict()
+            for entry in entries:
+                self._add(entry['name'], int(entry['index']))
+            self.loaded = time.time()
+        return 0
+
+    def _add(self, name, index):
+        self._by_name[name] = index
+        self._by_index[index] = name
+
+    def _stale(self):
+        return self.loaded is None or time.time() - self.loaded > self.ttl
+
+    def _refresh(self):
+        """ Reloads a stale index, once, however many threads ask for it """
+        if not self._stale():
+            return
+        with self._load_lock:
+            if self._stale():
+                self.load()
+
+    def add(self, name, index):
+        with self._lock:
+            self._add(name, int(index))
+
+    def learn(self, name, href):
+        """ Records a new object from the href returned when creating it """
+        self.add(name, href.rstrip('/').split('/')[-1])
+
+    def forget(self, name):
+        with self._lock:
+            index = self._by_name.pop(name, None)
+            if index is not None:
+                self._by_index.pop(index, None)
+
+    def index(self, name):
+        """ Returns the index of name, or None if the XMS does not know it.
+            Names not in the index are looked up on their own and added """
+        self._refresh()
+        self.lookups += 1
+        index = self._by_name.get(name)
+        if index is not None:
+            return index
+
+        self.misses += 1
+        try:
+            response = xtremRequestLib.request(self.ip,self.user,self.pwd,'get',self._url(),params={'name':name})
+        except requests.exceptions.RequestException as e:
+            print "Error:",e
+            return None
+        if response.status_code != 200:
+            return None
+        index = int(json.loads(response.text)['content']['index'])
+        self.add(name, index)
+        return index
+
+    def name(self, index):
+        self._refresh()
+        return self._by_index.get(int(index))
+
+    def href(self, name):
+        index = self.index(name)
+        if index is None:
+            return None
+        return '%s/%s' % (self._url(), index)
+
+    def stats(self):
+        return {'names':len(self._by_name),
+                'lookups':self.lookups,
+                'misses':self.misses,
+                'loaded':self.loaded}
+
+def getNameIndex(ip,user,pwd,objtype):
+    """ Returns the name index for objtype on an XMS, shared by callers
+        with the same credentials, which it loads and looks names up with """
+    key = (ip,objtype,xtremCacheLib.userKey(user,pwd))
+    with _indexes_lock:
+        name_index = _indexes.get(key)
+        if name_index is None:
+            name_index = XtremNameIndex(ip,user,pwd,objtype)
+            _indexes[key] = name_index
+        return name_index
+
+def resolveIndex(ip,user,pwd,objtype,name):
+    """ Returns the index for name, or None if it could not be resolved """
+    return getNameIndex(ip,user,pwd,objtype).index(name)
+
+def resolveId(ip,user,pwd,objtype,name):
+    """ The index for name when it resolves, otherwise the name itself,
+        for request fields such as vol-id that accept either """
+    index = resolveIndex(ip,user,pwd,objtype,name)
+    if index is None:
+        return name
+    return index
+
+def _indexesFor(ip,objtype):
+    """ The indexes of objtype on an XMS, one per set of credentials """
+    with _indexes_lock:
+        return [name_index for key, name_index in _indexes.items()
+                if key[:2] == (ip,objtype)]
+
+def learn(ip,objtype,name,result):
+    """ Adds an object just created to the indexes of its type, from the
+        links of the create response """
+    if not isinstance(result, dict):
+        return
+    for link in result.get('links',[]):
+        if link.get('rel') == 'self' and link.get('href'):
+            for name_index in _indexesFor(ip,objtype):
+                name_index.learn(name, link['href'])
+
+def forget(ip,objtype,name):
+    """ Drops a deleted object from the indexes of its type """
+    for name_index in _indexesFor(ip,objtype):
+        name_index.forget(name)
+
+def clearIndexes(ip=None):
+    with _indexes_lock:
+        for key in list(_indexes.keys()):
+            if ip is None or key[0] == ip:
+                del _indexes[key]
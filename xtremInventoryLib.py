@@ -0,0 +1,212 @@
+import json
+import time
+import zipfile
+import xtremOperationsLib
+import xtremWrapper
+
+# Format version written to the manifest, checked when loading
+INVENTORY_VERSION = 1
+
+# Collections captured per cluster by default
+INVENTORY_TYPES = ["bricks", "ssds", "slots", "daes", "dae-controllers",
+                   "dae-psus", "bbus", "infiniband-switches", "local-disks",
+                   "storage-controllers", "storage-controller-psus",
+                   "volumes", "snapshots", "snapshot-sets",
+                   "consistency-groups", "lun-maps", "initiators",
+                   "initiator-groups", "tags", "targets", "target-groups"]
+
+#Tables
+def _encodeTable(hrefs, rows):
+    """ Lays a list of detail dicts out as columns.  Columns of strings
+        with many repeats are stored as a dictionary of distinct values and
+        a code per row, and rows lacking a field are listed under absent """
+    columns = sorted(set(key for row in rows for key in row))
+    table = {"rows": len(rows), "hrefs": hrefs, "columns": dict()}
+    for column in columns:
+        values = []
+        absent = []
+        for i, row in enumerate(rows):
+            if column in row:
+                values.append(row[column])
+            else:
+                values.append(None)
+                absent.append(i)
+        encoded = {"values": values}
+        if all(value is None or isinstance(value, basestring) for value in values):
+            distinct = sorted(set(values), key=lambda v: (v is not None, v))
+            if len(distinct) * 2 <= len(values):
+                codes = dict((value, i) for i, value in enumerate(distinct))
+                encoded = {"dictionary": distinct,
+                           "codes": [codes[value] for value in values]}
+        if absent:
+            encoded["absent"] = absent
+        table["columns"][column] = encoded
+    return table
+
+def _decodeTable(table):
+    """ Rebuilds (hrefs, detail dicts) from an encoded table.  Repeated
+        strings come back as one shared object per distinct value """
+    rows = [dict() for i in range(table["rows"])]
+    for column, encoded in table["columns"].items():
+        if "dictionary" in encoded:
+            dictionary = encoded["dictionary"]
+            values = [dictionary[code] for code in encoded["codes"]]
+        else:
+            values = encoded["values"]
+        absent = set(encoded.get("absent", ()))
+        for i, value in enumerate(values):
+            if i not in absent:
+                rows[i][column] = value
+    return table["hrefs"], rows
+
+def _tableName(object_type):
+    return "tables/%s.json" % object_type
+
+#Export
+def _capture(objects):
+    return ([obj.href for obj in objects],
+            [obj.initial_object_details for obj in objects])
+
+def _captureType(array, cluster, object_type):
+    """ Lists every object of a type in a cluster with full=1, returning
+        1 if the listing failed """
+    params = dict((key.replace("_", "-"), val)
+                  for key, val in cluster._query_filters().items())
+    entries = xtremOperationsLib.getFullList(array.ip, array.user, array.pwd,
+                                             object_type, params=params)
+    if entries == 1:
+        return 1
+    hrefs = [entry.get("href") or "%s%s/%s" % (array.api_endpoint, object_type,
+                                                 entry["index"])
+             for entry in entries]
+    return hrefs, entries
+
+def exportInventory(array, path, types=INVENTORY_TYPES, clusters=None):
+    """ Captures the clusters of an XtremIO connection, and the collections
+        in types of each, into one compressed file at path.  Collections are
+        listed with full=1, one request per page.  clusters limits the
+        capture to the named clusters.  Returns the manifest written, or 1
+        without writing anything if any listing failed, so a truncated
+        inventory is never mistaken for a complete one """
+    selected = [cluster for cluster in array.clusters
+                if clusters is None or cluster.name in clusters]
+    tables = {"clusters": _capture(selected),
+              "xms": _capture(array.xms if isinstance(array.xms, list) else [])}
+    for object_type in types:
+        hrefs, rows = [], []
+        for cluster in selected:
+            captured = _captureType(array, cluster, object_type)
+            if captured == 1:
+                print "Error: listing %s of %s failed, inventory not written" % (
+                    object_type, cluster.name)
+                return 1
+            cluster_hrefs, cluster_rows = captured
+            hrefs.extend(cluster_hrefs)
+            rows.extend(cluster_rows)
+        tables[object_type] = (hrefs, rows)
+
+    manifest = {"version": INVENTORY_VERSION,
+                "ip": array.ip,
+                "created": time.time(),
+                "tables": dict((object_type, len(rows))
+                               for object_type, (hrefs, rows) in tables.items())}
+    archive = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+    try:
+        archive.writestr("manifest.json", json.dumps(manifest))
+        for object_type, (hrefs, rows) in tables.items():
+            archive.writestr(_tableName(object_type),
+                             json.dumps(_encodeTable(hrefs, rows),
+                                        separators=(",", ":")))
+    finally:
+        archive.close()
+    return manifest
+
+#Import
+class XtremInventory(object):
+    """ Read-only stand in for an XtremIO connection, serving objects from
+        an inventory file instead of the XMS.  Tables are decoded the first
+        time their type is asked for """
+
+    # Tells code that would otherwise go to the XMS, such as
+    # XtremCluster.topology(), to work from the captured rows
+    offline = True
+
+    def __init__(self, path):
+        self.path = path
+        archive = zipfile.ZipFile(path, "r")
+        try:
+            self.manifest = json.loads(archive.read("manifest.json"))
+            if self.manifest.get("version") != INVENTORY_VERSION:
+                raise ValueError("Unsupported inventory version %s" %
+                                 self.manifest.get("version"))
+            self._encoded = dict()
+            for object_type in self.manifest["tables"]:
+                self._encoded[object_type] = archive.read(_tableName(object_type))
+        finally:
+            archive.close()
+        self.ip = self.manifest["ip"]
+        self.created = self.manifest["created"]
+        self._tables = dict()
+        self._by_href = dict()
+        self.clusters = self._get_objects("clusters")
+        self.xms = self._get_objects("xms")
+
+    def __repr__(self):
+        return "<XtremInventory: %s captured %s>" % (
+            self.ip, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.created)))
+
+    @property
+    def types(self):
+        return sorted(self.manifest["tables"].keys())
+
+    def _table(self, object_type):
+        table = self._tables.get(object_type)
+        if table is None:
+            encoded = self._encoded.pop(object_type, None)
+            table = _decodeTable(json.loads(encoded)) if encoded else ([], [])
+            self._tables[object_type] = table
+            for href, row in zip(*table):
+                self._by_href[href] = row
+        return table
+
+    def rows(self, object_type):
+        """ Detail dicts of every object of object_type in the inventory """
+        return self._table(object_type)[1]
+
+    def _matches(self, row, filters):
+        for key, wanted in filters.items():
+            value = row.get(key)
+            if value == wanted:
+                continue
+            # id fields are [guid, name, index] lists, matched by any part
+            if isinstance(value, list) and not isinstance(wanted, list) and wanted in value:
+                continue
+            return False
+        return True
+
+    def iter_objects(self, object_type, full=None, prop=None, **kwargs):
+        """ Yields objects of object_type matching the filters, named as for
+            XtremIO.iter_objects.  full and prop are accepted and ignored,
+            since every object carries its captured details, as is a REST
+            filter expression """
+        kwargs.pop("lazy", None)
+        kwargs.pop("filter", None)
+        kwargs.pop("workers", None)
+        filters = dict((key.replace("_", "-"), val) for key, val in kwargs.items())
+        for href, row in zip(*self._table(object_type)):
+            if self._matches(row, filters):
+                object_data = {"name": row.get("name"), "href": href}
+                yield xtremWrapper.XtremObjFactory(object_type, object_data, self,
+                                                   details=row)
+
+    def _get_objects(self, object_type, full=None, prop=None, **kwargs):
+        return list(self.iter_objects(object_type, full, prop, **kwargs))
+
+    def _get_details(self, device_object, **kwargs):
+        """ The captured details of an object """
+        self._table(device_object.object_type)
+        return self._by_href.get(device_object.href)
+
+def importInventory(path):
+    """ Loads an inventory file written by exportInventory """
+    return XtremInventory(path)
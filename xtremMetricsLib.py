@@ -0,0 +1,185 @@
+import bisect
+import threading
+import time
+import requests
+
+# Upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30)
+
+_endpoints = dict()
+_endpoints_lock = threading.Lock()
+_enabled = True
+
+class EndpointMetrics(object):
+    """ Counters for the requests made to one endpoint of one XMS """
+
+    def __init__(self, ip, method, endpoint):
+        self.ip = ip
+        self.method = method
+        self.endpoint = endpoint
+        self.requests = 0
+        self.errors = 0
+        self.statuses = dict()
+        self.bytes = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, status, elapsed, size):
+        self.requests += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status is None or status >= 400:
+            self.errors += 1
+        self.bytes += size
+        self.latency_sum += elapsed
+        self.latency_max = max(self.latency_max, elapsed)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def quantile(self, q):
+        """ Estimates the q quantile (0-1) of latency from the histogram,
+            interpolating within the bucket it falls in """
+        if not self.requests:
+            return None
+        rank = q * self.requests
+        seen = 0
+        lower = 0.0
+        for i, count in enumerate(self.buckets):
+            upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.latency_max
+            upper = min(upper, self.latency_max)
+            if count and seen + count >= rank:
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return self.latency_max
+
+    def snapshot(self):
+        cumulative = []
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), self.buckets):
+            seen += count
+            cumulative.append((bound, seen))
+        return {'requests':self.requests,
+                'errors':self.errors,
+                'statuses':dict(self.statuses),
+                'bytes':self.bytes,
+                'latency_sum':self.latency_sum,
+                'latency_avg':self.latency_sum / self.requests if self.requests else None,
+                'latency_max':self.latency_max,
+                'latency_p50':self.quantile(0.5),
+                'latency_p95':self.quantile(0.95),
+                'latency_p99':self.quantile(0.99),
+                'buckets':cumulative}
+
+def endpointName(url):
+    """ Groups URLs by REST type, with object indexes folded into {index},
+        e.g. .../types/volumes/12 -> volumes/{index} """
+    path = url.split('?')[0].rstrip('/')
+    if '/types/' not in path:
+        return path.split('://')[-1].split('/', 1)[-1]
+    segments = path.split('/types/')[1].split('/')
+    if len(segments) > 1:
+        return segments[0] + '/{index}'
+    return segments[0]
+
+def _size(response, streamed):
+    """ Body size, from Content-Length for streamed responses, whose body
+        is not read here """
+    if streamed:
+        try:
+            return int(response.headers.get('Content-Length', 0))
+        except (TypeError, ValueError):
+            return 0
+    return len(response.content or '')
+
+def record(ip, method, url, status, elapsed, size=0):
+    """ Counts one request.  status is None for requests that got no reply """
+    key = (ip, method, endpointName(url))
+    with _endpoints_lock:
+        metrics = _endpoints.get(key)
+        if metrics is None:
+            metrics = EndpointMetrics(*key)
+            _endpoints[key] = metrics
+        metrics.record(status, elapsed, size)
+
+def metricsStage(request, next_stage):
+    """ Request pipeline stage counting every HTTP request sent """
+    if not _enabled:
+        return next_stage(request)
+    started = time.time()
+    try:
+        response = next_stage(request)
+    except requests.exceptions.RequestException:
+        record(request.ip, request.method, request.url, None, time.time() - started)
+        raise
+    record(request.ip, request.method, request.url, response.status_code,
+           time.time() - started, _size(response, request.stream))
+    return response
+
+def enableMetrics():
+    global _enabled
+    _enabled = True
+
+def disableMetrics():
+    global _enabled
+    _enabled = False
+
+def resetMetrics(ip=None):
+    with _endpoints_lock:
+        for key in list(_endpoints.keys()):
+            if ip is None or key[0] == ip:
+                del _endpoints[key]
+
+def getMetrics(ip=None):
+    """ Returns {ip: {"METHOD endpoint": counters}} for the requests made,
+        with latencies in seconds and p50/p95/p99 estimated from the
+        histogram """
+    with _endpoints_lock:
+        snapshots = [(key, metrics.snapshot()) for key, metrics in _endpoints.items()
+                     if ip is None or key[0] == ip]
+    result = dict()
+    for (xms, method, endpoint), snapshot in snapshots:
+        result.setdefault(xms, dict())['%s %s' % (method, endpoint)] = snapshot
+    return result
+
+def _labels(**labels):
+    return ','.join('%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                    for name, value in sorted(labels.items()))
+
+def _bound(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+def exportPrometheus(ip=None):
+    """ Returns the metrics in the Prometheus text exposition format """
+    with _endpoints_lock:
+        snapshots = sorted((key, metrics.snapshot()) for key, metrics in _endpoints.items()
+                           if ip is None or key[0] == ip)
+    requests_lines = []
+    errors_lines = []
+    bytes_lines = []
+    latency_lines = []
+    for (xms, method, endpoint), snapshot in snapshots:
+        base = dict(xms=xms, method=method, endpoint=endpoint)
+        for status, count in sorted(snapshot['statuses'].items()):
+            requests_lines.append('xtremio_requests_total{%s} %d' % (
+                _labels(status=status if status is not None else 'none', **base), count))
+        errors_lines.append('xtremio_request_errors_total{%s} %d' % (_labels(**base), snapshot['errors']))
+        bytes_lines.append('xtremio_response_bytes_total{%s} %d' % (_labels(**base), snapshot['bytes']))
+        for bound, count in snapshot['buckets']:
+            latency_lines.append('xtremio_request_duration_seconds_bucket{%s} %d' % (
+                _labels(le=_bound(bound), **base), count))
+        latency_lines.append('xtremio_request_duration_seconds_sum{%s} %r' % (
+            _labels(**base), snapshot['latency_sum']))
+        latency_lines.append('xtremio_request_duration_seconds_count{%s} %d' % (
+            _labels(**base), snapshot['requests']))
+
+    lines = ['# HELP xtremio_requests_total HTTP requests sent to the XMS by status.',
+             '# TYPE xtremio_requests_total counter'] + requests_lines
+    lines += ['# HELP xtremio_request_errors_total Requests failing to connect or answered with 4xx/5xx.',
+              '# TYPE xtremio_request_errors_total counter'] + errors_lines
+    lines += ['# HELP xtremio_response_bytes_total Bytes of response bodies received.',
+              '# TYPE xtremio_response_bytes_total counter'] + bytes_lines
+    lines += ['# HELP xtremio_request_duration_seconds Request latency.',
+              '# TYPE xtremio_request_duration_seconds histogram'] + latency_lines
+    return '\n'.join(lines) + '\n'
@@ -1,5 +1,9 @@
 import requests, json, sys
 import requests.packages.urllib3
+import xtremRequestLib
+import xtremCacheLib
+import xtremStreamLib
+import xtremIndexLib
 
 requests.packages.urllib3.disable_warnings()
 #Utility Functions
@@ -9,313 +13,249 @@ def getResponseStatus(response):
     else:
         return response.status_code
 
-#Volume APIs
-def getVolumes(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/volumes/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
+def streamList(ip,user,pwd,url,key):
+    """ Generator over the entries of a list response, parsed from the
+        byte stream as they arrive instead of loading the whole body.  A
+        failed or refused request raises requests.exceptions.RequestException
+        while iterating, so a truncated listing is never mistaken for a
+        complete one """
+    return xtremStreamLib.streamList(ip,user,pwd,url,key=key)
+
+def getFullList(ip,user,pwd,objtype,props=None,params=None):
+    """ Lists every object of objtype with its details (full=1), optionally
+        projected to the properties in props, following the paging links.
+        Returns a list of detail dicts """
+    query = dict(params or {})
+    query['full'] = 1
+    if props:
+        query['prop'] = list(props)
+    url = 'https://%s/api/json/v2/types/%s'%(ip,objtype)
+    entries = []
+    try:
+        while url:
+            response = xtremRequestLib.request(ip,user,pwd,'get',url,params=query)
+            listing = json.loads(response.text)
+            entries += listing.get(objtype,[])
+            url = None
+            query = None
+            for link in listing.get('links',[]):
+                if link.get('rel') == 'next':
+                    url = link.get('href')
+        return entries
     except requests.exceptions.RequestException as e:
         print "Error:",e
         return 1
+
+#Volume APIs
+def getVolumes(ip,user,pwd,stream=False):
+    if stream:
+        return streamList(ip,user,pwd,'https://%s/api/json/v2/types/volumes/'%(ip),'volumes')
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/volumes/'%(ip))
     
 def getVolumeDetails(ip,user,pwd,name):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/volumes?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/volumes?name=%s'%(ip,name))
 
 def createVolume(ip,user,pwd,volname,volsize):
-    try:
-        data = {'vol-name':volname,'vol-size':volsize}
-        response = requests.post('https://%s/api/json/v2/types/volumes/'%(ip),data=json.dumps(data),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    data = {'vol-name':volname,'vol-size':volsize}
+    result = xtremRequestLib.sendJson(ip,user,pwd,'post','https://%s/api/json/v2/types/volumes/'%(ip),data)
+    xtremCacheLib.invalidate(ip,"volumes")
+    xtremIndexLib.learn(ip,'volumes',volname,result)
+    return result
 
 def extendVolume(ip,user,pwd,volname,volsize):
-    try:
-        data = {'vol-size':volsize}
-        response = requests.put('https://%s/api/json/v2/types/volumes/?name=%s'%(ip,volname),data=json.dumps(data),auth=(user,pwd),verify=False)
-        if response.status_code == 200:
-            return 0
-        else:
-            return response.status_code
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    data = {'vol-size':volsize}
+    status = xtremRequestLib.sendStatus(ip,user,pwd,'put','https://%s/api/json/v2/types/volumes/?name=%s'%(ip,volname),data)
+    xtremCacheLib.invalidate(ip,"volumes")
+    return status
 
 def deleteVolume(ip,user,pwd,volname):
-    try:
-        response = requests.delete('https://%s/api/json/v2/types/volumes?name=%s'%(ip,volname),auth=(user,pwd),verify=False)
-        return getResponseStatus(response)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    status = xtremRequestLib.sendStatus(ip,user,pwd,'delete','https://%s/api/json/v2/types/volumes?name=%s'%(ip,volname))
+    xtremCacheLib.invalidate(ip,"volumes","consistency-groups","lun-maps")
+    xtremIndexLib.forget(ip,'volumes',volname)
+    return status
     
 #Initiator and Initiator Group APIs
-def getInitiatorGroups(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/initiator-groups/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+def getInitiatorGroups(ip,user,pwd,stream=False):
+    if stream:
+        return streamList(ip,user,pwd,'https://%s/api/json/v2/types/initiator-groups/'%(ip),'initiator-groups')
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/initiator-groups/'%(ip))
 
 def getInitiatorGroupDetails(ip,user,pwd,name):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/initiator-groups?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/initiator-groups?name=%s'%(ip,name))
     
 def createInitiatorGroup(ip,user,pwd,igname):
-    try:
-        data = {'ig-name':igname}
-        response = requests.post('https://%s/api/json/v2/types/initiator-groups/'%(ip),data=json.dumps(data),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    data = {'ig-name':igname}
+    result = xtremRequestLib.sendJson(ip,user,pwd,'post','https://%s/api/json/v2/types/initiator-groups/'%(ip),data)
+    xtremCacheLib.invalidate(ip,"initiator-groups")
+    xtremIndexLib.learn(ip,'initiator-groups',igname,result)
+    return result
 
 def deleteInitiatorGroup(ip,user,pwd,igname):
-    try:
-        response = requests.delete('https://%s/api/json/v2/types/initiator-groups?name=%s'%(ip,igname),auth=(user,pwd),verify=False)
-        return getResponseStatus(response)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    status = xtremRequestLib.sendStatus(ip,user,pwd,'delete','https://%s/api/json/v2/types/initiator-groups?name=%s'%(ip,igname))
+    xtremCacheLib.invalidate(ip,"initiator-groups","lun-maps")
+    xtremIndexLib.forget(ip,'initiator-groups',igname)
+    return status
 
-def getInitiators(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/initiators/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+def getInitiators(ip,user,pwd,stream=False):
+    if stream:
+        return streamList(ip,user,pwd,'https://%s/api/json/v2/types/initiators/'%(ip),'initiators')
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/initiators/'%(ip))
 
 def getInitiatorDetails(ip,user,pwd,name):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/initiators?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/initiators?name=%s'%(ip,name))
 
 def createInitiator(ip,user,pwd,igname,name,address):
-    try:
-        data = {'ig-name':igname,'initiator-name':name,'port-address':address}
-        response = requests.post('https://%s/api/json/v2/types/initiator-groups/'%(ip),data=json.dumps(data),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    data = {'ig-name':igname,'initiator-name':name,'port-address':address}
+    result = xtremRequestLib.sendJson(ip,user,pwd,'post','https://%s/api/json/v2/types/initiator-groups/'%(ip),data)
+    xtremCacheLib.invalidate(ip,"initiators","initiator-groups")
+    return result
 
 def deleteInitiator(ip,user,pwd,name):
-    try:
-        response = requests.delete('https://%s/api/json/v2/types/initiators?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return getResponseStatus(response)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    status = xtremRequestLib.sendStatus(ip,user,pwd,'delete','https://%s/api/json/v2/types/initiators?name=%s'%(ip,name))
+    xtremCacheLib.invalidate(ip,"initiators","initiator-groups")
+    return status
 
 #Snapshot API
 def createSnapshotOnVolume(ip,user,pwd,vollist=None):
-    try:
-        data = {'volume-list':vollist}
-        response = requests.post('https://%s/api/json/v2/types/snapshots/'%(ip),data=json.dumps(data),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    data = {'volume-list':vollist}
+    result = xtremRequestLib.sendJson(ip,user,pwd,'post','https://%s/api/json/v2/types/snapshots/'%(ip),data)
+    xtremCacheLib.invalidate(ip,"snapshots","snapshot-sets","volumes")
+    return result
 
 def createSnapshotOnCG(ip,user,pwd,cgname):
-    try:
-        data = {'consistency-group-id':int(getConsistencyGroupDetails(ip,user,pwd,cgname)['content']['index'])}
-        response = requests.post('https://%s/api/json/v2/types/snapshots/'%(ip),data=json.dumps(data),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    data = {'consistency-group-id':xtremIndexLib.resolveIndex(ip,user,pwd,'consistency-groups',cgname)}
+    result = xtremRequestLib.sendJson(ip,user,pwd,'post','https://%s/api/json/v2/types/snapshots/'%(ip),data)
+    xtremCacheLib.invalidate(ip,"snapshots","snapshot-sets","volumes","consistency-groups")
+    return result
 
-def getSnapshots(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/snapshots/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+def getSnapshots(ip,user,pwd,stream=False):
+    if stream:
+        return streamList(ip,user,pwd,'https://%s/api/json/v2/types/snapshots/'%(ip),'snapshots')
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/snapshots/'%(ip))
 
 def deleteSnapshot(ip,user,pwd,name):
-    try:
-        response = requests.delete('https://%s/api/json/v2/types/snapshots?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return getResponseStatus(response)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    status = xtremRequestLib.sendStatus(ip,user,pwd,'delete','https://%s/api/json/v2/types/snapshots?name=%s'%(ip,name))
+    xtremCacheLib.invalidate(ip,"snapshots","snapshot-sets","volumes","lun-maps")
+    xtremIndexLib.forget(ip,'volumes',name)
+    return status
+
+def refreshSnapshot(ip,user,pwd,source,target,source_type='consistency-group',no_backup=True):
+    """ Refreshes target from source with the array's refresh call.  source_type
+        is 'consistency-group', 'snapshot-set' or 'volume'; target is a
+        snapshot set, or a volume when refreshing from a volume """
+    if source_type == 'volume':
+        data = {'from-volume-id':xtremIndexLib.resolveId(ip,user,pwd,'volumes',source),
+                'to-volume-id':xtremIndexLib.resolveId(ip,user,pwd,'volumes',target)}
+    elif source_type == 'snapshot-set':
+        data = {'from-snapshot-set-id':xtremIndexLib.resolveId(ip,user,pwd,'snapshot-sets',source),
+                'to-snapshot-set-id':xtremIndexLib.resolveId(ip,user,pwd,'snapshot-sets',target)}
+    else:
+        data = {'from-consistency-group-id':xtremIndexLib.resolveId(ip,user,pwd,'consistency-groups',source),
+                'to-snapshot-set-id':xtremIndexLib.resolveId(ip,user,pwd,'snapshot-sets',target)}
+    if no_backup:
+        data['no-backup'] = True
+    result = xtremRequestLib.sendJson(ip,user,pwd,'post','https://%s/api/json/v2/types/snapshots/'%(ip),data)
+    xtremCacheLib.invalidate(ip,"snapshots","snapshot-sets","volumes")
+    if source_type != 'volume':
+        xtremIndexLib.forget(ip,'snapshot-sets',target)
+    return result
 
 #Snapshot set API
-def getSnapshotSets(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/snapshot-sets/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+def getSnapshotSets(ip,user,pwd,stream=False):
+    if stream:
+        return streamList(ip,user,pwd,'https://%s/api/json/v2/types/snapshot-sets/'%(ip),'snapshot-sets')
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/snapshot-sets/'%(ip))
 
 def getSnapshotSetDetails(ip,user,pwd,name):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/snapshot-sets?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/snapshot-sets?name=%s'%(ip,name))
 
 def deleteSnapshotSet(ip,user,pwd,name):
-    try:
-        response = requests.delete('https://%s/api/json/v2/types/snapshot-sets?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return getResponseStatus(response)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    status = xtremRequestLib.sendStatus(ip,user,pwd,'delete','https://%s/api/json/v2/types/snapshot-sets?name=%s'%(ip,name))
+    xtremCacheLib.invalidate(ip,"snapshot-sets","snapshots","volumes","lun-maps")
+    xtremIndexLib.forget(ip,'snapshot-sets',name)
+    return status
 
 #Consistency Group API
 def deleteConsistencyGroup(ip,user,pwd,name):
-    try:
-        response = requests.delete('https://%s/api/json/v2/types/consistency-groups?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return getResponseStatus(response)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    status = xtremRequestLib.sendStatus(ip,user,pwd,'delete','https://%s/api/json/v2/types/consistency-groups?name=%s'%(ip,name))
+    xtremCacheLib.invalidate(ip,"consistency-groups","volumes")
+    xtremIndexLib.forget(ip,'consistency-groups',name)
+    return status
 
-def getConsistencyGroups(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/consistency-groups/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+def getConsistencyGroups(ip,user,pwd,stream=False):
+    if stream:
+        return streamList(ip,user,pwd,'https://%s/api/json/v2/types/consistency-groups/'%(ip),'consistency-groups')
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/consistency-groups/'%(ip))
 
 def getConsistencyGroupDetails(ip,user,pwd,name):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/consistency-groups?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/consistency-groups?name=%s'%(ip,name))
 
 def createConsistencyGroup(ip,user,pwd,cgname):
-    try:
-        data = {'consistency-group-name':cgname}
-        response = requests.post('https://%s/api/json/v2/types/consistency-groups/'%(ip),data=json.dumps(data),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    data = {'consistency-group-name':cgname}
+    result = xtremRequestLib.sendJson(ip,user,pwd,'post','https://%s/api/json/v2/types/consistency-groups/'%(ip),data)
+    xtremCacheLib.invalidate(ip,"consistency-groups")
+    xtremIndexLib.learn(ip,'consistency-groups',cgname,result)
+    return result
 
 def addVolumeToCG(ip,user,pwd,cgname,volname):
-    try:
-        data = {'cg-id':cgname,'vol-id':volname}
-        response = requests.post('https://%s/api/json/v2/types/consistency-group-volumes/'%(ip),data=json.dumps(data),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    data = {'cg-id':xtremIndexLib.resolveId(ip,user,pwd,'consistency-groups',cgname),
+            'vol-id':xtremIndexLib.resolveId(ip,user,pwd,'volumes',volname)}
+    result = xtremRequestLib.sendJson(ip,user,pwd,'post','https://%s/api/json/v2/types/consistency-group-volumes/'%(ip),data)
+    xtremCacheLib.invalidate(ip,"consistency-groups","volumes")
+    return result
 
 def removeVolumeFromCG(ip,user,pwd,cgname,volname):
-    try:
-        data = {'cg-id':cgname,'vol-id':volname}
-        response = requests.delete('https://%s/api/json/v2/types/consistency-group-volumes?name=%s'%(ip,cgname),data=json.dumps(data),auth=(user,pwd),verify=False)
-        return getResponseStatus(response)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    data = {'cg-id':cgname,'vol-id':volname}
+    status = xtremRequestLib.sendStatus(ip,user,pwd,'delete','https://%s/api/json/v2/types/consistency-group-volumes?name=%s'%(ip,cgname),data)
+    xtremCacheLib.invalidate(ip,"consistency-groups","volumes")
+    return status
 
 #lunmapping API
 
 def addLunMapping(ip,user,pwd,volname,igname):
-    try:
-        data = {'vol-id':volname,'ig-id':igname}
-        response = requests.post('https://%s/api/json/v2/types/lun-maps/'%(ip),data=json.dumps(data),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-
-def getLunMappings(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/lun-maps/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    data = {'vol-id':xtremIndexLib.resolveId(ip,user,pwd,'volumes',volname),
+            'ig-id':xtremIndexLib.resolveId(ip,user,pwd,'initiator-groups',igname)}
+    result = xtremRequestLib.sendJson(ip,user,pwd,'post','https://%s/api/json/v2/types/lun-maps/'%(ip),data)
+    xtremCacheLib.invalidate(ip,"lun-maps","volumes","initiator-groups")
+    return result
+
+def deleteLunMapping(ip,user,pwd,index):
+    status = xtremRequestLib.sendStatus(ip,user,pwd,'delete','https://%s/api/json/v2/types/lun-maps/%s'%(ip,index))
+    xtremCacheLib.invalidate(ip,"lun-maps","volumes","initiator-groups")
+    return status
+
+def getLunMappings(ip,user,pwd,stream=False):
+    if stream:
+        return streamList(ip,user,pwd,'https://%s/api/json/v2/types/lun-maps/'%(ip),'lun-maps')
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/lun-maps/'%(ip))
 
 def getLunMappingDetails(ip,user,pwd,name):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/lun-maps?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/lun-maps?name=%s'%(ip,name))
 
 #Tags API
 def deleteTag(ip,user,pwd,name):
-    try:
-        response = requests.delete('https://%s/api/json/v2/types/tags?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return getResponseStatus(response)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    status = xtremRequestLib.sendStatus(ip,user,pwd,'delete','https://%s/api/json/v2/types/tags?name=%s'%(ip,name))
+    xtremCacheLib.invalidate(ip,"tags")
+    return status
 
 def getTags(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/tags/'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/tags/'%(ip))
 
 #Targets and Target groups
 def getTargetGroups(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/target-groups'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/target-groups'%(ip))
 
 def getTargetGroupDetails(ip,user,pwd,name):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/target-groups?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/target-groups?name=%s'%(ip,name))
 
 def getTargets(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/targets'%(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/targets'%(ip))
 
 def getTargetDetails(ip,user,pwd,name):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/targets?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/targets?name=%s'%(ip,name))
 
 #Scheduler API
 def deleteScheduler(ip,user,pwd,name):
-    try:
-        response = requests.delete('https://%s/api/json/v2/types/schedulers?name=%s'%(ip,name),auth=(user,pwd),verify=False)
-        return getResponseStatus(response)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
\ No newline at end of file
+    status = xtremRequestLib.sendStatus(ip,user,pwd,'delete','https://%s/api/json/v2/types/schedulers?name=%s'%(ip,name))
+    xtremCacheLib.invalidate(ip,"schedulers")
+    return status
\ No newline at end of file
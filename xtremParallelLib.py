@@ -0,0 +1,279 @@
+import threading
+import Queue
+import sys
+
+# Worker threads used by parallelMap when the caller does not say
+DEFAULT_WORKERS = 8
+
+# Requests allowed in flight against a single XMS across all pools
+DEFAULT_CONCURRENCY_LIMIT = 16
+
+# Adaptive limits: a request counts as overloaded when it fails or takes
+# LATENCY_TOLERANCE times the baseline latency, and each overload cuts the
+# limit by DECREASE_FACTOR
+LATENCY_TOLERANCE = 2.0
+DECREASE_FACTOR = 0.7
+
+_limiters = dict()
+_limiters_lock = threading.Lock()
+
+class ConcurrencyLimiter(object):
+    """ Caps the number of requests in flight against one XMS, and keeps
+        counters so the load put on it can be observed.  Used as a context
+        manager the slot is held per thread, so a thread already holding
+        one, e.g. a parallelMap task, passes straight through when its
+        requests take a slot in the request pipeline """
+
+    def __init__(self, limit=DEFAULT_CONCURRENCY_LIMIT):
+        self.limit = max(int(limit), 1)
+        self.in_flight = 0
+        self.peak = 0
+        self.total = 0
+        self.waited = 0
+        self.adaptive = False
+        self.min_limit = 1
+        self.max_limit = self.limit
+        self.tolerance = LATENCY_TOLERANCE
+        self.decrease = DECREASE_FACTOR
+        self.baseline = None
+        self.increases = 0
+        self.decreases = 0
+        self.overloads = 0
+        self._good = 0
+        self._drain = 0
+        self._listeners = []
+        self._local = threading.local()
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            if self.in_flight >= self.limit:
+                self.waited += 1
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+            self.total += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def acquire_or_notify(self, callback):
+        """ Takes a slot without waiting and returns True, or returns False
+            and calls callback() once a slot may have come free, so a
+            caller can park work instead of holding a thread on it """
+        with self._cond:
+            if self.in_flight < self.limit:
+                self.in_flight += 1
+                self.total += 1
+                self.peak = max(self.peak, self.in_flight)
+                return True
+            self.waited += 1
+            self._listeners.append(callback)
+            return False
+
+    def _wake_listeners(self):
+        """ Calls the parked callbacks, outside the lock """
+        with self._cond:
+            listeners, self._listeners = self._listeners, []
+        for callback in listeners:
+            callback()
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+        self._wake_listeners()
+
+    def set_limit(self, limit):
+        with self._cond:
+            self.limit = max(int(limit), 1)
+            self._cond.notify_all()
+        self._wake_listeners()
+
+    def set_adaptive(self, min_limit=1, max_limit=None,
+                     tolerance=LATENCY_TOLERANCE, decrease=DECREASE_FACTOR):
+        """ Lets record() move the limit between min_limit and max_limit
+            (the current limit by default), AIMD style: one more slot after
+            each full round of healthy requests, a multiplicative cut when
+            a request fails or its latency exceeds tolerance times the
+            baseline """
+        with self._cond:
+            self.adaptive = True
+            self.min_limit = max(int(min_limit), 1)
+            self.max_limit = max(int(max_limit or self.limit), self.min_limit)
+            self.tolerance = tolerance
+            self.decrease = decrease
+            self.limit = min(max(self.limit, self.min_limit), self.max_limit)
+            self._cond.notify_all()
+        self._wake_listeners()
+
+    def set_fixed(self):
+        with self._cond:
+            self.adaptive = False
+
+    def record(self, latency, ok=True):
+        """ Feeds back the outcome of one request.  Only changes the limit
+            when adaptive """
+        if self._adapt(latency, ok):
+            self._wake_listeners()
+
+    def _adapt(self, latency, ok):
+        """ Moves the limit, returning True if it was raised """
+        with self._cond:
+            if not self.adaptive:
+                return False
+            # The baseline follows the fastest responses, drifting up slowly
+            # so a lasting change in the XMS is eventually accepted
+            if ok:
+                if self.baseline is None or latency < self.baseline:
+                    self.baseline = latency
+                else:
+                    self.baseline += (latency - self.baseline) * 0.01
+            overloaded = not ok or (self.baseline is not None and
+                                    latency > self.baseline * self.tolerance)
+
+            # Requests sent before a cut are still answered slowly, so
+            # they are let drain before the limit is cut again
+            if self._drain > 0:
+                self._drain -= 1
+            if overloaded:
+                self.overloads += 1
+                self._good = 0
+                if self._drain <= 0 and self.limit > self.min_limit:
+                    self.limit = max(int(self.limit * self.decrease), self.min_limit)
+                    self.decreases += 1
+                    self._drain = self.in_flight
+                return False
+
+            self._good += 1
+            if self._good >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                self.increases += 1
+                self._good = 0
+                self._cond.notify()
+                return True
+            return False
+
+    def stats(self):
+        with self._cond:
+            return {'limit':self.limit,
+                    'in_flight':self.in_flight,
+                    'peak':self.peak,
+                    'total':self.total,
+                    'waited':self.waited,
+                    'adaptive':self.adaptive,
+                    'baseline':self.baseline,
+                    'overloads':self.overloads,
+                    'increases':self.increases,
+                    'decreases':self.decreases}
+
+    def held(self):
+        """ True when the calling thread holds a slot """
+        return getattr(self._local, 'depth', 0) > 0
+
+    def adopt(self):
+        """ Makes the calling thread the holder of a slot taken elsewhere,
+            e.g. with acquire_or_notify.  Use it as a context manager, which
+            releases the slot at the end """
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        return _AdoptedSlot(self)
+
+    def _leave(self):
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            self.release()
+
+    def __enter__(self):
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            self.acquire()
+        self._local.depth = depth + 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._leave()
+        return False
+
+class _AdoptedSlot(object):
+    """ Context manager returned by ConcurrencyLimiter.adopt """
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+
+    def __enter__(self):
+        return self.limiter
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.limiter._leave()
+        return False
+
+def getLimiter(ip):
+    """ Returns the concurrency limiter shared by everything talking to ip """
+    with _limiters_lock:
+        limiter = _limiters.get(ip)
+        if limiter is None:
+            limiter = ConcurrencyLimiter()
+            _limiters[ip] = limiter
+        return limiter
+
+def setConcurrencyLimit(ip,limit):
+    getLimiter(ip).set_limit(limit)
+
+def setAdaptiveConcurrency(ip,min_limit=1,max_limit=DEFAULT_CONCURRENCY_LIMIT,
+                           tolerance=LATENCY_TOLERANCE,decrease=DECREASE_FACTOR):
+    """ Lets the limit of an XMS follow what it can sustain, starting from
+        max_limit, from the latency and errors of its requests """
+    limiter = getLimiter(ip)
+    limiter.set_limit(max_limit)
+    limiter.set_adaptive(min_limit, max_limit, tolerance, decrease)
+
+def getConcurrencyStats(ip=None):
+    """ Returns limiter counters as a dict of {ip: stats} """
+    with _limiters_lock:
+        items = list(_limiters.items())
+    return dict((key, limiter.stats()) for key, limiter in items
+                if ip is None or key == ip)
+
+def parallelMap(func,items,workers=DEFAULT_WORKERS,ip=None):
+    """ Applies func to every item on a bounded pool of worker threads and
+        returns the results in the same order as items.  When ip is given
+        each call also holds a slot of that XMS's concurrency limiter.
+        The first exception raised by func is re-raised to the caller """
+    items = list(items)
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    limiter = getLimiter(ip) if ip is not None else None
+    errors = []
+    work = Queue.Queue()
+    for index in range(len(items)):
+        work.put(index)
+
+    def worker():
+        while not errors:
+            try:
+                index = work.get_nowait()
+            except Queue.Empty:
+                return
+            try:
+                if limiter is not None:
+                    with limiter:
+                        results[index] = func(items[index])
+                else:
+                    results[index] = func(items[index])
+            except Exception:
+                errors.append(sys.exc_info())
+
+    threads = []
+    for i in range(max(min(int(workers), len(items)), 1)):
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        exc_type, exc_value, exc_tb = errors[0]
+        raise exc_type, exc_value, exc_tb
+
+    return results
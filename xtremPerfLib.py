@@ -0,0 +1,243 @@
+import requests, json, sys, time
+import requests.packages.urllib3
+import xtremRequestLib
+import xtremOperationsLib
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+requests.packages.urllib3.disable_warnings()
+
+# Metrics read by the per-metric getters in xtremXmsLib and xtremXenvLib
+XMS_METRICS = ['rd-latency','wr-latency','rd-bw','wr-bw','bw','rd-iops','wr-iops','iops']
+VOLUME_METRICS = ['rd-latency','wr-latency','iops','rd-bw','wr-bw']
+
+def sampleMetrics(ip,user,pwd,objtype,metrics,names=None):
+    """ Reads several metrics of several objects in one pass.  A single
+        named object is read with one request, anything more with one bulk
+        listing per page projected to the metrics asked for.  Returns
+        {'timestamp':t, 'type':objtype, 'metrics':metrics,
+         'samples':{name:{metric:value}}} or 1 on error """
+    if isinstance(names, basestring):
+        names = [names]
+    timestamp = time.time()
+
+    if names is not None and len(names) == 1:
+        try:
+            response = xtremRequestLib.request(ip,user,pwd,'get','https://%s/api/json/v2/types/%s/?name=%s'%(ip,objtype,names[0]))
+        except requests.exceptions.RequestException as e:
+            print "Error:",e
+            return 1
+        if response.status_code != 200:
+            return response.status_code
+        entries = [json.loads(response.text)['content']]
+    else:
+        entries = xtremOperationsLib.getFullList(ip,user,pwd,objtype,props=['name']+list(metrics))
+        if entries == 1:
+            return 1
+
+    wanted = set(names) if names is not None else None
+    samples = dict()
+    for entry in entries:
+        name = entry.get('name')
+        if wanted is not None and name not in wanted:
+            continue
+        samples[name] = dict((metric, entry.get(metric)) for metric in metrics)
+
+    return {'timestamp':timestamp,
+            'type':objtype,
+            'metrics':list(metrics),
+            'samples':samples}
+
+def sampleXms(ip,user,pwd,metrics=XMS_METRICS):
+    """ All requested XMS metrics from a single read of xenvs/?name=xms """
+    record = sampleMetrics(ip,user,pwd,'xenvs',metrics,names=['xms'])
+    if not isinstance(record, dict):
+        return record
+    return record['samples'].get('xms')
+
+def sampleVolumes(ip,user,pwd,names=None,metrics=VOLUME_METRICS):
+    """ Requested metrics for the named volumes, or all volumes """
+    return sampleMetrics(ip,user,pwd,'volumes',metrics,names=names)
+
+#Historical performance
+class XtremPerfSeries(object):
+    """ Columnar store of performance samples.  Each sample row is a
+        timestamp, an object (kept as an integer code into names) and one
+        float64 column per metric, so memory is a few bytes per value
+        rather than a dict per sample """
+
+    def __init__(self, metrics, names=None):
+        _requireNumpy()
+        self.metrics = list(metrics)
+        self.names = list(names or [])
+        self._codes = dict((name, i) for i, name in enumerate(self.names))
+        self.timestamps = numpy.zeros(0, dtype=numpy.int64)
+        self.objects = numpy.zeros(0, dtype=numpy.int32)
+        self.values = numpy.zeros((0, len(self.metrics)), dtype=numpy.float64)
+        self._pending = []
+
+    def __len__(self):
+        self._compact()
+        return len(self.timestamps)
+
+    def __repr__(self):
+        return "<XtremPerfSeries: %d samples, %d objects, %d metrics>" % (
+            len(self), len(self.names), len(self.metrics))
+
+    def _code(self, name):
+        code = self._codes.get(name)
+        if code is None:
+            code = len(self.names)
+            self.names.append(name)
+            self._codes[name] = code
+        return code
+
+    def append(self, timestamps, names, values):
+        """ Adds samples, values holding one row per sample with a column
+            per metric in self.metrics """
+        codes = numpy.array([self._code(name) for name in names], dtype=numpy.int32)
+        values = numpy.array(values, dtype=numpy.float64).reshape(len(codes), len(self.metrics))
+        self._pending.append((numpy.array(timestamps, dtype=numpy.int64), codes, values))
+
+    def _compact(self):
+        """ Joins appended chunks into the main arrays """
+        if not self._pending:
+            return
+        chunks = [(self.timestamps, self.objects, self.values)] + self._pending
+        self.timestamps = numpy.concatenate([c[0] for c in chunks])
+        self.objects = numpy.concatenate([c[1] for c in chunks])
+        self.values = numpy.concatenate([c[2] for c in chunks])
+        self._pending = []
+
+    def _subset(self, mask):
+        subset = XtremPerfSeries(self.metrics, self.names)
+        subset.timestamps = self.timestamps[mask]
+        subset.objects = self.objects[mask]
+        subset.values = self.values[mask]
+        return subset
+
+    def column(self, metric):
+        self._compact()
+        return self.values[:, self.metrics.index(metric)]
+
+    def range(self, start=None, end=None, names=None):
+        """ Samples with start <= timestamp < end, optionally only for
+            the named objects, as a new series """
+        self._compact()
+        mask = numpy.ones(len(self.timestamps), dtype=bool)
+        if start is not None:
+            mask &= self.timestamps >= start
+        if end is not None:
+            mask &= self.timestamps < end
+        if names is not None:
+            codes = [self._codes[name] for name in names if name in self._codes]
+            mask &= numpy.in1d(self.objects, codes)
+        return self._subset(mask)
+
+    def series(self, name, metric):
+        """ Returns (timestamps, values) arrays for one object and metric,
+            in time order """
+        self._compact()
+        mask = self.objects == self._codes[name]
+        timestamps = self.timestamps[mask]
+        order = numpy.argsort(timestamps, kind="mergesort")
+        return timestamps[order], self.column(metric)[mask][order]
+
+    def downsample(self, interval, how="mean"):
+        """ Buckets samples into interval second periods per object,
+            combining them with mean, max, min or sum """
+        self._compact()
+        subset = XtremPerfSeries(self.metrics, self.names)
+        if not len(self.timestamps):
+            return subset
+
+        buckets = self.timestamps - self.timestamps % interval
+        keys = numpy.empty(len(buckets), dtype=[('t', numpy.int64), ('o', numpy.int32)])
+        keys['t'] = buckets
+        keys['o'] = self.objects
+        unique, groups = numpy.unique(keys, return_inverse=True)
+
+        if how in ("mean", "sum"):
+            values = numpy.zeros((len(unique), len(self.metrics)))
+            numpy.add.at(values, groups, numpy.nan_to_num(self.values))
+            if how == "mean":
+                counts = numpy.zeros((len(unique), len(self.metrics)))
+                numpy.add.at(counts, groups, ~numpy.isnan(self.values))
+                with numpy.errstate(invalid="ignore", divide="ignore"):
+                    values = values / counts
+        elif how in ("max", "min"):
+            fill = -numpy.inf if how == "max" else numpy.inf
+            values = numpy.full((len(unique), len(self.metrics)), fill)
+            ufunc = numpy.fmax if how == "max" else numpy.fmin
+            ufunc.at(values, groups, self.values)
+            values[numpy.isinf(values)] = numpy.nan
+        else:
+            raise ValueError("Unknown downsample method %s" % how)
+
+        subset.timestamps = unique['t']
+        subset.objects = unique['o']
+        subset.values = values
+        return subset
+
+def _requireNumpy():
+    if numpy is None:
+        raise ImportError("numpy is required for XtremPerfSeries")
+
+def _perfTime(value):
+    """ Formats epoch seconds (UTC) for the performance API, passing
+        strings through unchanged """
+    if isinstance(value, basestring):
+        return value
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(value))
+
+def collectPerformance(ip,user,pwd,entity,metrics,names=None,
+                       granularity='one_minute',start=None,end=None,
+                       series=None):
+    """ Pulls historical samples from the performance endpoint for an
+        entity (Volume, Cluster, Initiator, ...) page by page into an
+        XtremPerfSeries, adding to series if one is given.  start and end
+        are epoch seconds (UTC) or XMS time strings """
+    if series is None:
+        series = XtremPerfSeries(metrics)
+    query = {'entity':entity, 'granularity':granularity, 'prop':list(metrics)}
+    if names:
+        query['obj-list'] = list(names)
+    if start is not None:
+        query['from-time'] = _perfTime(start)
+    if end is not None:
+        query['to-time'] = _perfTime(end)
+
+    url = 'https://%s/api/json/v2/types/performance'%(ip)
+    try:
+        while url:
+            response = xtremRequestLib.request(ip,user,pwd,'get',url,params=query)
+            if response.status_code != 200:
+                return response.status_code
+            page = json.loads(response.text)
+            _appendCounters(series, page.get('members',[]), page.get('counters',[]))
+            url = None
+            query = None
+            for link in page.get('links',[]):
+                if link.get('rel') == 'next':
+                    url = link.get('href')
+    except requests.exceptions.RequestException as e:
+        print "Error:",e
+        return 1
+
+    return series
+
+def _appendCounters(series, members, counters):
+    """ Adds one page of performance counters, whose rows are laid out as
+        described by members (timestamp in ms, name, then metrics) """
+    if not counters:
+        return
+    columns = zip(*counters)
+    timestamps = numpy.array(columns[members.index('timestamp')], dtype=numpy.int64) // 1000
+    names = columns[members.index('name')]
+    values = numpy.array([columns[members.index(metric)] if metric in members
+                          else (None,) * len(counters)
+                          for metric in series.metrics], dtype=numpy.float64).T
+    series.append(timestamps, names, values)
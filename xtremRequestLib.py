@@ -0,0 +1,273 @@
+import threading
+import random
+import time
+import sys
+import requests, json
+import requests.packages.urllib3
+import xtremSessionLib
+import xtremCacheLib
+import xtremParallelLib
+import xtremMetricsLib
+
+requests.packages.urllib3.disable_warnings()
+
+# Replies meaning the XMS is overloaded or unavailable rather than that the
+# request itself is wrong
+OVERLOAD_STATUSES = (429,502,503,504)
+
+# Methods safe to send again when a reply is lost or refused
+IDEMPOTENT_METHODS = ('GET','PUT','DELETE')
+
+# Retry defaults: attempts after the first, and the base and cap in seconds
+# of the jittered exponential backoff between them
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30
+
+# Seconds to wait for a connection and for each read of the reply, so a
+# hung XMS fails the request (and frees its limiter slot) instead of
+# holding it forever.  Overridden per XMS with setTimeout
+DEFAULT_TIMEOUT = (10, 300)
+
+_timeouts = dict()
+
+class XtremRequest(object):
+    """ One HTTP request to an XMS as it passes through the pipeline.
+        Stages may change it, and can leave notes for each other in meta """
+
+    def __init__(self, ip, user, pwd, method, url, params=None, data=None,
+                 stream=False, timeout=None):
+        self.ip = ip
+        self.user = user
+        self.pwd = pwd
+        self.method = method.upper()
+        self.url = url
+        self.params = params
+        self.data = data
+        self.stream = stream
+        self.timeout = timeout if timeout is not None else getTimeout(ip)
+        self.meta = dict()
+
+    def __repr__(self):
+        return "<XtremRequest: %s %s>" % (self.method, self.url)
+
+    @property
+    def object_type(self):
+        """ The REST type the request is for, from the .../types/<type> URL """
+        path = self.url.split('?')[0]
+        if '/types/' not in path:
+            return None
+        return path.split('/types/')[1].split('/')[0] or None
+
+def send(request):
+    """ Last stage of the pipeline, issues the request on the pooled session """
+    session = xtremSessionLib.getSession(request.ip,request.user,request.pwd)
+    return session.request(request.method, request.url,
+                           params=request.params, data=request.data,
+                           stream=request.stream, timeout=request.timeout)
+
+def setTimeout(ip,timeout):
+    """ Sets the timeout of requests to an XMS, in seconds or as a
+        (connect, read) pair """
+    _timeouts[ip] = timeout
+
+def getTimeout(ip):
+    return _timeouts.get(ip, DEFAULT_TIMEOUT)
+
+#Stages
+# A stage is called as stage(request, next_stage) and returns the response,
+# normally by calling next_stage(request) and passing back what it returns
+
+def cacheStage(request, next_stage):
+    """ Answers GETs from the XMS response cache when caching is enabled for
+        it in xtremCacheLib, storing successful responses.  Entries are
+        keyed on the credentials too, so users never see each other's """
+    cache = xtremCacheLib.getCache(request.ip)
+    if cache is None or request.method != 'GET' or request.stream:
+        return next_stage(request)
+
+    key = (xtremCacheLib.userKey(request.user, request.pwd), request.url,
+           xtremCacheLib.paramsKey(request.params))
+    hit, response = cache.get(key)
+    if hit:
+        request.meta['cached'] = True
+        return response
+
+    response = next_stage(request)
+    if response.status_code == 200:
+        cache.put(key, response, request.object_type)
+    return response
+
+def timingStage(request, next_stage):
+    """ Records how long the request took in request.meta['elapsed'] """
+    started = time.time()
+    try:
+        return next_stage(request)
+    finally:
+        request.meta['elapsed'] = time.time() - started
+
+def makeTracingStage(out=sys.stderr):
+    """ Returns a stage writing a line per request to out """
+    def tracingStage(request, next_stage):
+        started = time.time()
+        try:
+            response = next_stage(request)
+        except requests.exceptions.RequestException as e:
+            out.write("%s %s failed after %.3fs: %s\n" % (request.method, request.url,
+                                                          time.time() - started, e))
+            raise
+        out.write("%s %s %s %.3fs\n" % (request.method, request.url,
+                                        response.status_code, time.time() - started))
+        return response
+    return tracingStage
+
+def _retryAfter(response):
+    """ Seconds asked for by a Retry-After header, or None """
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+def makeRetryStage(retries=DEFAULT_RETRIES, statuses=OVERLOAD_STATUSES,
+                   backoff=DEFAULT_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF,
+                   methods=IDEMPOTENT_METHODS):
+    """ Returns a stage retrying requests that fail to connect or come back
+        with one of statuses.  Attempt n waits a random time of up to
+        backoff * 2**n seconds (capped at max_backoff, and at least any
+        Retry-After asked for), so clients backing off together spread out.
+        Only methods are retried, as a lost POST may still have been done """
+    def retryStage(request, next_stage):
+        if request.method not in methods:
+            return next_stage(request)
+        attempt = 0
+        while True:
+            try:
+                response = next_stage(request)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout):
+                if attempt >= retries:
+                    raise
+                response = None
+            else:
+                if response.status_code not in statuses or attempt >= retries:
+                    return response
+
+            delay = random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+            if response is not None:
+                delay = max(delay, min(_retryAfter(response) or 0, max_backoff))
+            attempt += 1
+            request.meta['retries'] = attempt
+            time.sleep(delay)
+    return retryStage
+
+retryStage = makeRetryStage()
+
+def adaptiveStage(request, next_stage):
+    """ Holds a slot of the concurrency limiter of the XMS for each attempt,
+        so requests from any thread count against its limit, and reports
+        their latency and outcome to it, which adapts the limit when set
+        adaptive.  Threads already holding a slot, such as parallelMap and
+        dispatcher tasks, do not take another """
+    limiter = xtremParallelLib.getLimiter(request.ip)
+    with limiter:
+        started = time.time()
+        try:
+            response = next_stage(request)
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout):
+            limiter.record(time.time() - started, False)
+            raise
+    limiter.record(time.time() - started,
+                   response.status_code not in OVERLOAD_STATUSES)
+    return response
+
+# The limiter slot is taken outside metricsStage, so request latencies
+# cover the XMS round trip and not the wait for a slot
+_stages = [cacheStage, retryStage, adaptiveStage, xtremMetricsLib.metricsStage]
+_stages_lock = threading.Lock()
+
+def addMiddleware(stage, position=None):
+    """ Adds a stage to the pipeline, after the existing ones by default.
+        Earlier stages wrap later ones """
+    with _stages_lock:
+        if position is None:
+            _stages.append(stage)
+        else:
+            _stages.insert(position, stage)
+
+def removeMiddleware(stage):
+    with _stages_lock:
+        if stage in _stages:
+            _stages.remove(stage)
+
+def getMiddleware():
+    with _stages_lock:
+        return list(_stages)
+
+def _chain(stages, position):
+    if position == len(stages):
+        return send
+    stage = stages[position]
+    rest = _chain(stages, position + 1)
+    return lambda request: stage(request, rest)
+
+def execute(request):
+    """ Runs an XtremRequest through the pipeline, returning the response """
+    return _chain(getMiddleware(), 0)(request)
+
+def request(ip,user,pwd,method,url,params=None,data=None,stream=False,
+            timeout=None):
+    """ Sends a request through the pipeline.  data is JSON encoded when it is
+        not already a string.  timeout defaults to the one set for the XMS.
+        Connection errors and timeouts are raised as the
+        requests.exceptions.RequestException they are """
+    if data is not None and not isinstance(data, basestring):
+        data = json.dumps(data)
+    return execute(XtremRequest(ip,user,pwd,method,url,params,data,stream,
+                                timeout))
+
+#Helpers for the function libraries
+def getJson(ip,user,pwd,url,params=None):
+    """ GETs url returning the decoded body, or 1 after printing the error
+        if the request could not be made """
+    try:
+        response = request(ip,user,pwd,'get',url,params=params)
+        return json.loads(response.text)
+    except requests.exceptions.RequestException as e:
+        print "Error:",e
+        return 1
+
+def sendJson(ip,user,pwd,method,url,data=None):
+    """ Sends data to url returning the decoded reply, or 1 on error """
+    try:
+        response = request(ip,user,pwd,method,url,data=data)
+        return json.loads(response.text)
+    except requests.exceptions.RequestException as e:
+        print "Error:",e
+        return 1
+
+def sendStatus(ip,user,pwd,method,url,data=None):
+    """ Sends a request returning 0 on a 200 reply, the status code for any
+        other reply, or 1 on error """
+    try:
+        response = request(ip,user,pwd,method,url,data=data)
+        if response.status_code == 200:
+            return 0
+        return response.status_code
+    except requests.exceptions.RequestException as e:
+        print "Error:",e
+        return 1
+
+def getContentField(ip,user,pwd,url,field,scale=None):
+    """ Returns one field of the content of a single object reply, divided by
+        scale if given.  None for a reply other than 200, 1 on error """
+    try:
+        response = request(ip,user,pwd,'get',url)
+    except requests.exceptions.RequestException as e:
+        print "Error:",e
+        return 1
+    if response.status_code == 200:
+        value = json.loads(response.text)['content'][field]
+        if scale:
+            return float(value)/scale
+        return value
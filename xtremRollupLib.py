@@ -0,0 +1,167 @@
+import time
+import warnings
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class XtremRollup(object):
+    """ Keeps the last window samples of a set of metrics for many objects
+        in one (window, objects, metrics) array, so rates, moving averages,
+        percentiles and rankings are computed for every object at once.
+
+        Samples are the records returned by xtremPerfLib.sampleMetrics or
+        lists of XtremObjects.  Metrics named in counters are cumulative and
+        are turned into per second rates by rates() """
+
+    def __init__(self, metrics, window=60, counters=None):
+        if numpy is None:
+            raise ImportError("numpy is required for XtremRollup")
+        self.metrics = list(metrics)
+        self.window = window
+        self.counters = set(counters or [])
+        self.names = []
+        self._codes = dict()
+        self._times = numpy.full(window, numpy.nan)
+        self._values = numpy.full((window, 0, len(self.metrics)), numpy.nan)
+        self._count = 0
+
+    def __repr__(self):
+        return "<XtremRollup: %d samples, %d objects, %d metrics>" % (
+            min(self._count, self.window), len(self.names), len(self.metrics))
+
+    def _grow(self, names):
+        """ Assigns codes to objects not seen before, widening the array """
+        new = [name for name in names if name not in self._codes]
+        if not new:
+            return
+        for name in new:
+            self._codes[name] = len(self.names)
+            self.names.append(name)
+        extra = numpy.full((self.window, len(new), len(self.metrics)), numpy.nan)
+        self._values = numpy.concatenate([self._values, extra], axis=1)
+
+    def add_sample(self, record):
+        """ Adds a sampleMetrics record, {'timestamp':t, 'samples':{name:
+            {metric:value}}} """
+        samples = record['samples']
+        self._add(record['timestamp'], samples.keys(),
+                  [[values.get(metric) for metric in self.metrics]
+                   for values in samples.values()])
+
+    def add_objects(self, objects, timestamp=None):
+        """ Adds one sample taken from the details of XtremObjects """
+        if timestamp is None:
+            timestamp = time.time()
+        self._add(timestamp, [obj.name for obj in objects],
+                  [[obj.initial_object_details.get(metric)
+                    for metric in self.metrics] for obj in objects])
+
+    def _add(self, timestamp, names, rows):
+        names = list(names)
+        self._grow(names)
+        slot = self._count % self.window
+        row = numpy.full((len(self.names), len(self.metrics)), numpy.nan)
+        if names:
+            codes = numpy.array([self._codes[name] for name in names])
+            row[codes] = numpy.array(rows, dtype=numpy.float64)
+        self._values[slot] = row
+        self._times[slot] = timestamp
+        self._count += 1
+
+    def _ordered(self):
+        """ Returns (times, values) of the samples held, oldest first """
+        held = min(self._count, self.window)
+        order = (numpy.arange(held) + self._count - held) % self.window
+        return self._times[order], self._values[order]
+
+    def _column(self, metric):
+        times, values = self._ordered()
+        return times, values[:, :, self.metrics.index(metric)]
+
+    def _by_name(self, array):
+        return dict(zip(self.names, array.tolist()))
+
+    def latest(self, metric):
+        """ {name: most recent value} """
+        times, values = self._column(metric)
+        if not len(times):
+            return dict()
+        return self._by_name(values[-1])
+
+    def rates(self, metric):
+        """ {name: per second rate} between the last two samples.  Counters
+            that went backwards (a reset) give NaN """
+        times, values = self._column(metric)
+        if len(times) < 2:
+            return dict()
+        elapsed = times[-1] - times[-2]
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            rates = (values[-1] - values[-2]) / elapsed
+            rates[rates < 0] = numpy.nan
+        return self._by_name(rates)
+
+    def _series(self, metric):
+        """ The metric per sample, as per second rates for counters """
+        times, values = self._column(metric)
+        if metric in self.counters:
+            with numpy.errstate(invalid="ignore", divide="ignore"):
+                values = numpy.diff(values, axis=0) / numpy.diff(times)[:, None]
+                values[values < 0] = numpy.nan
+        return values
+
+    def moving_average(self, metric, samples=None):
+        """ {name: mean of the last samples values}, all held by default """
+        values = self._series(metric)
+        if samples is not None:
+            values = values[-samples:]
+        if not len(values):
+            return dict()
+        return self._by_name(_nanmean(values))
+
+    def percentile(self, metric, q):
+        """ {name: q-th percentile over the window}, e.g. q=99 for p99 """
+        values = self._series(metric)
+        if not len(values):
+            return dict()
+        return self._by_name(_nanpercentile(values, q))
+
+    def top(self, metric, n=10, by="latest"):
+        """ The n objects with the highest value of metric as a list of
+            (name, value), ranked by the latest value, the rate, the mean
+            or the p95/p99 over the window """
+        if by == "latest":
+            values = self._series(metric)[-1:]
+            ranking = values[0] if len(values) else numpy.zeros(0)
+        elif by == "rate":
+            ranking = numpy.array([self.rates(metric).get(name, numpy.nan)
+                                   for name in self.names])
+        elif by == "mean":
+            ranking = _nanmean(self._series(metric))
+        elif by in ("p95", "p99"):
+            ranking = _nanpercentile(self._series(metric), int(by[1:]))
+        else:
+            raise ValueError("Unknown ranking %s" % by)
+
+        if not len(ranking):
+            return []
+        ranking = numpy.where(numpy.isnan(ranking), -numpy.inf, ranking)
+        n = min(n, len(ranking))
+        best = numpy.argpartition(-ranking, n - 1)[:n]
+        best = best[numpy.argsort(-ranking[best], kind="mergesort")]
+        return [(self.names[i], float(ranking[i])) for i in best
+                if ranking[i] != -numpy.inf]
+
+def _nanmean(values):
+    with numpy.errstate(invalid="ignore"):
+        counts = (~numpy.isnan(values)).sum(axis=0)
+        return numpy.nansum(values, axis=0) / numpy.where(counts, counts, numpy.nan)
+
+def _nanpercentile(values, q):
+    if not len(values):
+        return numpy.zeros(0)
+    # Objects with no samples in the window come back as NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return numpy.nanpercentile(values, q, axis=0)
@@ -0,0 +1,79 @@
+import threading
+import requests
+import requests.packages.urllib3
+from requests.adapters import HTTPAdapter
+
+requests.packages.urllib3.disable_warnings()
+
+# Number of keep-alive connections held open to each XMS
+DEFAULT_POOL_SIZE = 10
+
+_sessions = dict()
+_sessions_lock = threading.Lock()
+_pool_size = DEFAULT_POOL_SIZE
+
+def setPoolSize(size):
+    """ Sets the connection pool size used for sessions created from now on """
+    global _pool_size
+    _pool_size = int(size)
+
+def getPoolSize():
+    return _pool_size
+
+def getSession(ip,user,pwd):
+    """ Returns the shared keep-alive session for an XMS, creating it on
+        first use.  Sessions are keyed on XMS address and user """
+    key = (ip,user)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None or session.auth != (user,pwd):
+            session = requests.Session()
+            session.auth = (user,pwd)
+            session.verify = False
+            session.headers.update({'Connection':'keep-alive'})
+            adapter = HTTPAdapter(pool_connections=1,
+                                  pool_maxsize=_pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[key] = session
+        return session
+
+def closeSession(ip,user=None):
+    """ Closes the pooled connections for an XMS, for all users if
+        user is not given """
+    with _sessions_lock:
+        for key in list(_sessions.keys()):
+            if key[0] == ip and (user is None or key[1] == user):
+                _sessions.pop(key).close()
+
+def closeAllSessions():
+    with _sessions_lock:
+        for key in list(_sessions.keys()):
+            _sessions.pop(key).close()
+
+def getSessionStats(ip=None):
+    """ Returns connection reuse statistics per XMS as a dict of
+        {ip: {'connections':n, 'requests':n, 'reused':n, 'pool_size':n}} """
+    stats = dict()
+    with _sessions_lock:
+        items = list(_sessions.items())
+
+    for (session_ip, user), session in items:
+        if ip is not None and session_ip != ip:
+            continue
+        entry = stats.setdefault(session_ip, {'connections':0,
+                                              'requests':0,
+                                              'reused':0,
+                                              'pool_size':0})
+        for adapter in set(session.adapters.values()):
+            entry['pool_size'] = max(entry['pool_size'], adapter._pool_maxsize)
+            pools = adapter.poolmanager.pools
+            for pool_key in list(pools.keys()):
+                pool = pools.get(pool_key)
+                if pool is None:
+                    continue
+                entry['connections'] += pool.num_connections
+                entry['requests'] += pool.num_requests
+        entry['reused'] = max(entry['requests'] - entry['connections'], 0)
+
+    return stats
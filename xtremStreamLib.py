@@ -0,0 +1,120 @@
+import codecs
+import json
+import requests
+import xtremRequestLib
+
+# Bytes read from the response socket at a time
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = u" \t\n\r"
+_decoder = json.JSONDecoder()
+
+class _StreamReader(object):
+    """ Text buffer over a byte stream, decoding JSON values from it and
+        reading more of the stream only when a value is incomplete """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = u""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """ Appends the next chunk to the buffer, dropping what has already
+            been consumed.  Returns False once the stream is exhausted """
+        if self.eof:
+            return False
+        try:
+            text = self._utf8.decode(next(self._chunks))
+        except StopIteration:
+            text = self._utf8.decode(b"", True)
+            self.eof = True
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return not self.eof or bool(text)
+
+    def peek(self):
+        """ Returns the next non-whitespace character, or '' at the end """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return u""
+
+    def expect(self, chars):
+        char = self.peek()
+        if char == u"" or char not in chars:
+            raise ValueError("Malformed JSON response, expected %s at %r"
+                             % (" or ".join(chars), char))
+        self.pos += 1
+        return char
+
+    def value(self):
+        """ Decodes the next complete JSON value.  A value running up to the
+            end of the buffer is only trusted at the end of the stream, since
+            a number or literal may continue in the next chunk """
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            except ValueError:
+                if self.eof:
+                    raise
+            self.fill()
+
+def iterResponse(response,key=None,extras=None,chunk_size=CHUNK_SIZE):
+    """ Yields the entries of the top level list in a JSON response as they
+        are decoded from the raw byte stream, without holding the whole body
+        in memory.  key picks the list, otherwise any list other than
+        "links" is used.  Other top level members are put in extras """
+    reader = _StreamReader(response.iter_content(chunk_size))
+    reader.expect(u"{")
+    if reader.peek() == u"}":
+        return
+
+    while True:
+        name = reader.value()
+        reader.expect(u":")
+        if (reader.peek() == u"[" and name != u"links"
+                and (key is None or name == key)):
+            reader.pos += 1
+            if reader.peek() == u"]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.expect(u",]") == u"]":
+                        break
+        else:
+            value = reader.value()
+            if extras is not None:
+                extras[name] = value
+
+        if reader.expect(u",}") == u"}":
+            return
+
+def streamList(ip,user,pwd,url,params=None,key=None,extras=None):
+    """ GETs url and yields the entries of its list as they arrive.  The
+        links of the response are left in extras, once iteration is done.
+        A reply other than 200 raises requests.exceptions.HTTPError, as its
+        error body would otherwise read as an empty list """
+    response = xtremRequestLib.request(ip,user,pwd,'get',url,params=params,stream=True)
+    if response.status_code != 200:
+        try:
+            message = json.loads(response.text).get('message')
+        except (ValueError, AttributeError):
+            message = None
+        response.close()
+        raise requests.exceptions.HTTPError("%s Error: %s for url: %s" % (
+            response.status_code, message, url), response=response)
+    try:
+        for entry in iterResponse(response, key, extras):
+            yield entry
+    finally:
+        response.close()
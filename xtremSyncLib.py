@@ -0,0 +1,201 @@
+import time
+import xtremOperationsLib
+import xtremRequestLib
+import xtremParallelLib
+import xtremWrapper
+
+# Collections kept in sync by default
+SYNC_TYPES = ["volumes", "snapshots", "snapshot-sets", "consistency-groups",
+              "lun-maps", "initiators", "initiator-groups"]
+
+# Properties listed on every poll alongside name and index.  An object whose
+# watched properties change has its details fetched again.  Configuration
+# fields only, as counters such as iops change on every poll
+WATCH_PROPS = {"volumes": ["vol-size", "vol-access", "num-of-dest-snaps", "tag-list"],
+               "snapshots": ["vol-size", "vol-access", "num-of-dest-snaps", "tag-list"],
+               "snapshot-sets": ["num-of-vols", "tag-list"],
+               "consistency-groups": ["num-of-vols", "tag-list"],
+               "lun-maps": ["lun", "vol-name", "ig-name"],
+               "initiators": ["ig-id", "port-address"],
+               "initiator-groups": ["num-of-initiators", "num-of-vols", "tag-list"]}
+
+# Above this many objects to fetch, one full listing of the type is cheaper
+# than a request per object
+BULK_THRESHOLD = 50
+
+class XtremInventorySync(object):
+    """ Local model of the collections of an XMS, or one cluster of it,
+        refreshed incrementally.  Each poll lists only names, indexes and
+        the watched properties of every object, and fetches full details
+        only for objects that are new or whose watched properties changed,
+        so its cost follows the churn rather than the number of objects.
+
+        poll() returns the changes as event dicts with 'event' ('add',
+        'remove' or 'change'), 'type', 'index', 'name', 'old' and 'new'
+        (the details before and after) and, for changes, 'changed' (the
+        watched properties that differ).  Callbacks passed to subscribe()
+        are called with each event as well.  When a listing or fetch fails
+        poll() returns 1 instead, and failed is set until a poll succeeds;
+        the types that did sync still send their events, and the others
+        are caught up on the next poll """
+
+    def __init__(self, array, cluster=None, types=SYNC_TYPES, watch=None,
+                 workers=xtremParallelLib.DEFAULT_WORKERS,
+                 bulk_threshold=BULK_THRESHOLD):
+        self.array = array
+        self.cluster = cluster
+        self.types = list(types)
+        self.watch = dict(WATCH_PROPS)
+        self.watch.update(watch or {})
+        self.workers = workers
+        self.bulk_threshold = bulk_threshold
+        self.polls = 0
+        self.fetched = 0
+        self.last_poll = None
+        self.failed = False
+        self.failures = 0
+        self._details = dict((object_type, dict()) for object_type in self.types)
+        self._signatures = dict((object_type, dict()) for object_type in self.types)
+        self._callbacks = []
+
+    def __repr__(self):
+        return "<XtremInventorySync: %s, %d objects>" % (
+            self.array.ip, sum(len(objects) for objects in self._details.values()))
+
+    def subscribe(self, callback):
+        self._callbacks.append(callback)
+
+    def _params(self):
+        if self.cluster is None:
+            return None
+        return dict((key.replace("_", "-"), val)
+                    for key, val in self.cluster._query_filters().items())
+
+    def _list(self, object_type, props=None):
+        return xtremOperationsLib.getFullList(self.array.ip, self.array.user,
+                                              self.array.pwd, object_type,
+                                              props=props, params=self._params())
+
+    def _signature(self, entry, props):
+        return tuple([entry.get("name")] + [repr(entry.get(prop)) for prop in props])
+
+    def _fetch(self, object_type, indexes):
+        """ Returns {index: details} for the given objects, from one full
+            listing when there are many, otherwise a request per object """
+        if not indexes:
+            return dict()
+        if len(indexes) > self.bulk_threshold:
+            entries = self._list(object_type)
+            if entries == 1:
+                return 1
+            wanted = set(indexes)
+            self.fetched += len(wanted)
+            return dict((int(entry["index"]), entry) for entry in entries
+                        if int(entry["index"]) in wanted)
+
+        def fetch(index):
+            info = xtremRequestLib.getJson(self.array.ip, self.array.user,
+                                           self.array.pwd, self.href(object_type, index))
+            if isinstance(info, dict):
+                return info.get("content")
+            return None
+
+        indexes = list(indexes)
+        results = xtremParallelLib.parallelMap(fetch, indexes, self.workers,
+                                               ip=self.array.ip)
+        self.fetched += len(indexes)
+        return dict((index, details) for index, details in zip(indexes, results)
+                    if details is not None)
+
+    def _sync(self, object_type):
+        props = self.watch.get(object_type) or []
+        listing = self._list(object_type, ["name", "index"] + props)
+        if listing == 1:
+            return 1
+
+        known = self._signatures[object_type]
+        current = dict((int(entry["index"]), self._signature(entry, props))
+                       for entry in listing)
+        added = [index for index in current if index not in known]
+        removed = [index for index in known if index not in current]
+        changed = [index for index in current
+                   if index in known and current[index] != known[index]]
+
+        details = self._fetch(object_type, added + changed)
+        if details == 1:
+            return 1
+
+        events = []
+        model = self._details[object_type]
+        for index in removed:
+            old = model.pop(index, None)
+            del known[index]
+            events.append({"event": "remove", "type": object_type, "index": index,
+                           "name": old.get("name") if old else None,
+                           "old": old, "new": None})
+        for index in added + changed:
+            if index not in details:
+                # Deleted between the listing and the fetch, seen next poll
+                continue
+            old = model.get(index)
+            model[index] = details[index]
+            event = {"event": "change" if old is not None else "add",
+                     "type": object_type, "index": index,
+                     "name": details[index].get("name"),
+                     "old": old, "new": details[index]}
+            if old is not None:
+                event["changed"] = [prop for prop in ["name"] + props
+                                    if old.get(prop) != details[index].get(prop)]
+            known[index] = current[index]
+            events.append(event)
+        return events
+
+    def poll(self):
+        """ Brings the model up to date, returning the changes seen, or 1
+            if any type could not be synced """
+        events = []
+        failed = False
+        for object_type in self.types:
+            type_events = self._sync(object_type)
+            if type_events == 1:
+                failed = True
+            else:
+                events.extend(type_events)
+        self.polls += 1
+        self.last_poll = time.time()
+        self.failed = failed
+        if failed:
+            self.failures += 1
+        for event in events:
+            for callback in self._callbacks:
+                callback(event)
+        if failed:
+            return 1
+        return events
+
+    def href(self, object_type, index):
+        return "%s%s/%s" % (self.array.api_endpoint, object_type, index)
+
+    def details(self, object_type):
+        """ {index: details} of the objects of object_type """
+        return self._details[object_type]
+
+    def objects(self, object_type):
+        """ The objects of object_type as XtremObjects, built from the
+            model without any request """
+        objects = []
+        for index, details in self._details[object_type].items():
+            object_data = {"name": details.get("name"),
+                           "href": self.href(object_type, index)}
+            objects.append(xtremWrapper.XtremObjFactory(object_type, object_data,
+                                                        self.array, details=details))
+        return objects
+
+    def stats(self):
+        return {"polls": self.polls,
+                "fetched": self.fetched,
+                "last_poll": self.last_poll,
+                "failed": self.failed,
+                "failures": self.failures,
+                "objects": dict((object_type, len(objects))
+                                for object_type, objects in self._details.items())}
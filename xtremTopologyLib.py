@@ -0,0 +1,241 @@
+import xtremSyncLib
+
+# Collections loaded into the topology
+TOPOLOGY_TYPES = ["volumes", "snapshots", "snapshot-sets", "consistency-groups",
+                  "lun-maps", "initiators", "initiator-groups"]
+
+# Foreign key fields the topology indexes, watched by its sync on top of
+# the default watched properties, so a membership change is seen even
+# when counts such as num-of-vols stay the same
+TOPOLOGY_WATCH = {"lun-maps": ["vol-index", "ig-index"],
+                  "initiators": ["ig-id"],
+                  "consistency-groups": ["vol-list"],
+                  "snapshot-sets": ["vol-list"],
+                  "snapshots": ["ancestor-vol-id"]}
+
+def _watch(types, extra=None):
+    watch = dict()
+    for object_type in types:
+        props = list(xtremSyncLib.WATCH_PROPS.get(object_type, []))
+        for prop in TOPOLOGY_WATCH.get(object_type, []) + (extra or {}).get(object_type, []):
+            if prop not in props:
+                props.append(prop)
+        watch[object_type] = props
+    return watch
+
+def _index(ref):
+    """ The index out of a [guid, name, index] reference or a bare index """
+    if isinstance(ref, list):
+        ref = ref[2] if len(ref) > 2 else None
+    try:
+        return int(ref)
+    except (TypeError, ValueError):
+        return None
+
+def _indexes(refs):
+    return set(i for i in (_index(ref) for ref in refs or []) if i is not None)
+
+def _single(ref):
+    return _indexes([ref])
+
+def _references(object_type, details):
+    """ The foreign keys of an object, as {relation: set of indexes}.
+        Snapshots are volumes, so volume references cover both """
+    if object_type == "lun-maps":
+        return {"volume": _single(details.get("vol-index", details.get("vol-id"))),
+                "initiator-group": _single(details.get("ig-index", details.get("ig-id")))}
+    if object_type == "initiators":
+        return {"initiator-group": _single(details.get("ig-id"))}
+    if object_type in ("consistency-groups", "snapshot-sets"):
+        return {"volume": _indexes(details.get("vol-list"))}
+    if object_type == "snapshots":
+        return {"ancestor": _single(details.get("ancestor-vol-id"))}
+    return dict()
+
+class _InventorySource(object):
+    """ Stands in for the XtremInventorySync of an offline inventory, which
+        never changes: the first poll adds every captured object of the
+        cluster, and later polls find nothing """
+
+    def __init__(self, inventory, cluster, types):
+        self.inventory = inventory
+        self.cluster = cluster
+        self.types = list(types)
+        self._details = dict((object_type, dict()) for object_type in self.types)
+        self._callbacks = []
+        self._loaded = False
+        self.failed = False
+
+    def subscribe(self, callback):
+        self._callbacks.append(callback)
+
+    def details(self, object_type):
+        return self._details[object_type]
+
+    def poll(self):
+        if self._loaded:
+            return []
+        self._loaded = True
+        filters = self.cluster._query_filters() if self.cluster is not None else {}
+        events = []
+        for object_type in self.types:
+            model = self._details[object_type]
+            for obj in self.inventory.iter_objects(object_type, **filters):
+                index = int(obj.object_id)
+                model[index] = obj.initial_object_details
+                events.append({"event": "add", "type": object_type, "index": index,
+                               "name": obj.name, "old": None, "new": model[index]})
+        for event in events:
+            for callback in self._callbacks:
+                callback(event)
+        return events
+
+class XtremTopology(object):
+    """ In-memory relational model of the volumes, snapshots, lun maps,
+        initiators, initiator groups, consistency groups and snapshot sets
+        of a cluster.  Each type is a table of details keyed by index, with
+        a name index, and every foreign key field has a reverse hash index,
+        so topology questions resolve with a few dict lookups.
+
+        The tables are loaded and refreshed by an XtremInventorySync, and
+        the indexes are updated from its events, so refresh() costs what
+        the sync poll does and touches only the objects that changed.  For
+        an offline XtremInventory the tables are loaded from its captured
+        rows instead, and refresh() has nothing to do """
+
+    def __init__(self, array, cluster=None, types=TOPOLOGY_TYPES, **kwargs):
+        if getattr(array, "offline", False):
+            self.sync = _InventorySource(array, cluster, types)
+        else:
+            kwargs["watch"] = _watch(types, kwargs.get("watch"))
+            self.sync = xtremSyncLib.XtremInventorySync(array, cluster, types, **kwargs)
+        self.sync.subscribe(self._apply)
+        self._names = dict((object_type, dict()) for object_type in types)
+        self._reverse = dict()
+        self.refresh()
+
+    def __repr__(self):
+        return "<XtremTopology: %s>" % ", ".join(
+            "%d %s" % (len(self.sync.details(object_type)), object_type)
+            for object_type in self.sync.types)
+
+    def refresh(self):
+        """ Brings the model up to date, returning the sync events, or 1
+            if the sync failed and the model may be out of date """
+        return self.sync.poll()
+
+    def _link(self, object_type, index, details, add):
+        for relation, targets in _references(object_type, details).items():
+            reverse = self._reverse.setdefault((object_type, relation), dict())
+            for target in targets:
+                if add:
+                    reverse.setdefault(target, set()).add(index)
+                else:
+                    sources = reverse.get(target)
+                    if sources is not None:
+                        sources.discard(index)
+                        if not sources:
+                            del reverse[target]
+
+    def _apply(self, event):
+        object_type = event["type"]
+        index = event["index"]
+        names = self._names[object_type]
+        if event["old"] is not None:
+            self._link(object_type, index, event["old"], False)
+            if names.get(event["old"].get("name")) == index:
+                del names[event["old"].get("name")]
+        if event["new"] is not None:
+            self._link(object_type, index, event["new"], True)
+            names[event["new"].get("name")] = index
+
+    #Lookups
+    def get(self, object_type, name):
+        """ Details of the named object, or None """
+        index = self._names[object_type].get(name)
+        if index is None:
+            return None
+        return self.sync.details(object_type).get(index)
+
+    def _volume_index(self, name):
+        for object_type in ("volumes", "snapshots"):
+            index = self._names.get(object_type, {}).get(name)
+            if index is not None:
+                return index
+        return None
+
+    def _volume(self, index):
+        for object_type in ("volumes", "snapshots"):
+            if object_type in self._names:
+                details = self.sync.details(object_type).get(index)
+                if details is not None:
+                    return details
+        return None
+
+    def _sources(self, object_type, relation, targets):
+        reverse = self._reverse.get((object_type, relation), {})
+        sources = set()
+        for target in targets:
+            sources |= reverse.get(target, set())
+        return sources
+
+    def _details(self, object_type, indexes):
+        table = self.sync.details(object_type)
+        return [table[index] for index in sorted(indexes) if index in table]
+
+    #Queries
+    def lun_maps_for_volume(self, name):
+        index = self._volume_index(name)
+        return self._details("lun-maps", self._sources("lun-maps", "volume", [index]))
+
+    def initiator_groups_for_volume(self, name):
+        """ Initiator groups the volume or snapshot is mapped to """
+        groups = set()
+        for lun_map in self.lun_maps_for_volume(name):
+            groups |= _references("lun-maps", lun_map)["initiator-group"]
+        return self._details("initiator-groups", groups)
+
+    def initiators_for_volume(self, name):
+        """ Initiators that can see the volume or snapshot """
+        groups = [_index(group.get("index")) for group in self.initiator_groups_for_volume(name)]
+        return self._details("initiators", self._sources("initiators", "initiator-group", groups))
+
+    def volumes_for_initiator_group(self, name):
+        """ Volumes and snapshots mapped to the initiator group """
+        index = self._names["initiator-groups"].get(name)
+        volumes = set()
+        for lun_map in self._details("lun-maps", self._sources("lun-maps", "initiator-group", [index])):
+            volumes |= _references("lun-maps", lun_map)["volume"]
+        return [volume for volume in (self._volume(i) for i in sorted(volumes)) if volume]
+
+    def volumes_for_initiator(self, name):
+        """ Volumes and snapshots the initiator can see """
+        initiator = self.get("initiators", name)
+        if initiator is None:
+            return []
+        group = self.sync.details("initiator-groups").get(_index(initiator.get("ig-id")))
+        if group is None:
+            return []
+        return self.volumes_for_initiator_group(group.get("name"))
+
+    def volumes_in_consistency_group(self, name):
+        group = self.get("consistency-groups", name)
+        if group is None:
+            return []
+        volumes = _references("consistency-groups", group)["volume"]
+        return [volume for volume in (self._volume(i) for i in sorted(volumes)) if volume]
+
+    def consistency_groups_for_volume(self, name):
+        index = self._volume_index(name)
+        return self._details("consistency-groups",
+                             self._sources("consistency-groups", "volume", [index]))
+
+    def snapshot_sets_for_volume(self, name):
+        index = self._volume_index(name)
+        return self._details("snapshot-sets",
+                             self._sources("snapshot-sets", "volume", [index]))
+
+    def snapshots_of(self, name):
+        """ Snapshots taken directly from the volume or snapshot """
+        index = self._volume_index(name)
+        return self._details("snapshots", self._sources("snapshots", "ancestor", [index]))
@@ -1,24 +1,249 @@
 import requests, json, sys
+import collections
+import copy
+import heapq
+import threading
 import requests.packages.urllib3
+import xtremSessionLib
+import xtremRequestLib
+import xtremMetricsLib
+import xtremParallelLib
+import xtremCacheLib
+import xtremStreamLib
+import xtremTopologyLib
 
 requests.packages.urllib3.disable_warnings()
 
+# Properties pulled for each volume by XtremCluster.hot_volumes
+HOT_VOLUME_PROPS = ["iops", "rd-iops", "wr-iops", "bw", "rd-bw", "wr-bw",
+                    "avg-latency", "rd-latency", "wr-latency"]
+
+# Snapshot indexes asked for per filtered request by XtremVolume.snapshots
+SNAPSHOT_FILTER_BATCH = 50
+
+# String values of a detail field are shared between compact objects until
+# the field has this many distinct values, beyond which they are unique
+INTERN_LIMIT = 256
+
+_ABSENT = object()
+_strings = dict()
+_schemas = dict()
+_schemas_lock = threading.Lock()
+
+def _intern(value):
+    """ One shared copy of each object type and href prefix """
+    return _strings.setdefault(value, value)
+
+def _shareKey(value):
+    """ Key under which equal detail values are shared.  The type is part
+        of it, so 1, 1.0 and True are kept apart as JSON tells them apart """
+    if isinstance(value, list):
+        return (list, tuple(_shareKey(item) for item in value))
+    return (type(value), value)
+
+class XtremSchema(object):
+    """ Field layout shared by the compact details of one object type.
+        Fields are given a position the first time they are seen, and
+        repeated values of fields with few distinct values are kept once """
+
+    def __init__(self, object_type):
+        self.object_type = object_type
+        self.fields = []
+        self.positions = dict()
+        self._seen = []
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<XtremSchema: %s, %d fields>" % (self.object_type, len(self.fields))
+
+    def pack(self, details):
+        """ Returns the values of details as a tuple in field order """
+        with self._lock:
+            for key in details:
+                if key not in self.positions:
+                    self.positions[key] = len(self.fields)
+                    self.fields.append(key)
+                    self._seen.append(dict())
+            values = [_ABSENT] * len(self.fields)
+            for key, value in details.items():
+                position = self.positions[key]
+                values[position] = self._share(position, value)
+        return tuple(values)
+
+    def _share(self, position, value):
+        seen = self._seen[position]
+        if seen is None:
+            return value
+        try:
+            key = _shareKey(value)
+            shared = seen.get(key)
+        except TypeError:
+            return value
+        if shared is None:
+            if len(seen) >= INTERN_LIMIT:
+                self._seen[position] = None
+                return value
+            seen[key] = shared = value
+        return shared
+
+def _schema(object_type):
+    with _schemas_lock:
+        schema = _schemas.get(object_type)
+        if schema is None:
+            schema = XtremSchema(object_type)
+            _schemas[object_type] = schema
+        return schema
+
+class XtremDetails(object):
+    """ Read-only dict-like view of object details packed by an
+        XtremSchema.  Equal values, lists included, are one object shared
+        by many objects' details and must not be modified.  copy() returns
+        a plain dict with lists copied, e.g. for json.dumps or to edit """
+    __slots__ = ("_schema", "_values")
+
+    def __init__(self, schema, values):
+        self._schema = schema
+        self._values = values
+
+    def __getitem__(self, key):
+        position = self._schema.positions.get(key)
+        if position is not None and position < len(self._values):
+            value = self._values[position]
+            if value is not _ABSENT:
+                return value
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key, _ABSENT) is not _ABSENT
+
+    def items(self):
+        return [(field, value) for field, value in zip(self._schema.fields, self._values)
+                if value is not _ABSENT]
+
+    def keys(self):
+        return [field for field, value in self.items()]
+
+    def values(self):
+        return [value for field, value in self.items()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.items())
+
+    def copy(self):
+        return dict((field, copy.deepcopy(value) if isinstance(value, list) else value)
+                    for field, value in self.items())
+
+    def __eq__(self, other):
+        return dict(self.items()) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+collections.Mapping.register(XtremDetails)
+
+# object_type -> class, as registered and as resolved by XtremObjFactory
+_registered_classes = dict()
+_resolved_classes = dict()
+_classes_lock = threading.Lock()
+
+class _XtremObjectType(type):
+   """ Drops the resolved classes whenever an XtremObject subclass is
+       defined, so the factory sees classes defined after its first use """
+   def __init__(cls, name, bases, namespace):
+       type.__init__(cls, name, bases, namespace)
+       with _classes_lock:
+           _resolved_classes.clear()
+
 class XtremObject(object):
-   def __init__(self,object_data, xtremio_connection):
-       """Parent class to make working with XtremIO returned objects easier """
-       self.data = object_data
+   __metaclass__ = _XtremObjectType
+   __slots__ = ("name", "object_id", "object_type", "parent_connection",
+                "_href_base", "_details", "_sys_id")
+
+   # Detail fields the class reads to identify the object, always included
+   # when a bulk listing is projected to a property list
+   id_props = ()
+
+   @classmethod
+   def is_class_for(cls, object_type):
+       """ Subclasses return True for the object types they represent.
+           XtremObject itself is used for types no subclass claims """
+       return False
+
+   def __init__(self,object_data, xtremio_connection, sys_id=None, lazy=False,
+                details=None):
+       """Parent class to make working with XtremIO returned objects easier
+
+          When lazy is set the object is built from the list response only,
+          and the details are not fetched until something needs them.
+          sys_id may be passed in from the query context to avoid that.
+          details may be passed in when they came back with a bulk list.
+          When the connection is compact the details are packed into the
+          shared schema of the object type. """
        self.name = object_data["name"]
-       self.href = object_data["href"]
        self.parent_connection = xtremio_connection
 
-       # Object name and type comes off the end of the href URL
-       self.object_id = object_data["href"].split("/")[-1] 
-       self.object_type = object_data["href"].split("/")[-2]
+       # Object name and type comes off the end of the href URL, which is
+       # rebuilt from the shared prefix when asked for
+       href_base, self.object_id = object_data["href"].rsplit("/", 1)
+       self.object_type = _intern(href_base.split("/")[-1])
+       self._href_base = _intern(href_base)
 
        # We track the sys-id of the system the object is from, since we will
        # regularly need it
-       self.initial_object_details = self.get_details()
-       self.sys_id = self.initial_object_details["sys-id"]
+       self._details = None
+       self._sys_id = sys_id
+       if details is not None:
+           self._set_details(details)
+           self._sys_id = details.get("sys-id", sys_id)
+       elif not lazy:
+           self._set_details(self.get_details())
+           self._sys_id = self._details["sys-id"]
+
+   def _set_details(self, details):
+       if isinstance(details, dict) and getattr(self.parent_connection, "compact", False):
+           schema = _schema(self.object_type)
+           details = XtremDetails(schema, schema.pack(details))
+       self._details = details
+
+   @property
+   def href(self):
+       return self._href_base + "/" + self.object_id
+
+   @property
+   def data(self):
+       """ The name and href the object was built from """
+       return {"name": self.name, "href": self.href}
+
+   @property
+   def initial_object_details(self):
+       """ Details as first retrieved from the array, fetched on first
+           access for lazily built objects """
+       if self._details is None:
+           self._set_details(self.get_details())
+       return self._details
+
+   @property
+   def sys_id(self):
+       if self._sys_id is None:
+           self._sys_id = self.initial_object_details["sys-id"]
+       return self._sys_id
+
+   @property
+   def is_loaded(self):
+       """ True once the object details have been fetched from the array """
+       return self._details is not None
      
    def get_details(self, **kwargs):
        return self.parent_connection._get_details(self, **kwargs)
@@ -29,59 +254,97 @@ class XtremObject(object):
 class XtremVolume(XtremObject):
     """ XtremVolume subclass of XtremObject, provides functions for 
     properties and functions specifically around a volume """
+    __slots__ = ()
 
     @classmethod
     def is_class_for(cls, object_type):
         return object_type == "volumes"
 
-    def __init__(self, object_data, xtremio_connection):
-        XtremObject.__init__(self, object_data, xtremio_connection)
+    def __init__(self, object_data, xtremio_connection, **kwargs):
+        XtremObject.__init__(self, object_data, xtremio_connection, **kwargs)
  
     @property
     def snapshots(self):
+        """ Snapshots of this volume, from bulk listings filtered to the
+            indexes in dest-snap-list, SNAPSHOT_FILTER_BATCH per request,
+            instead of a request per snapshot.  dest-snap-list is read from
+            fresh details, as loaded ones may be projected or out of date """
         volume_details = self.get_details()
+        if volume_details == 1:
+            return 1
   
         if "dest-snap-list" in volume_details:
-            snap_list = []
-            for i in volume_details["dest-snap-list"]:
-                snap_index = i[2]
-                snap_list += self.parent_connection.get_snapshots(index=snap_index)
-            return snap_list
+            snap_indexes = [str(i[2]) for i in volume_details["dest-snap-list"]]
+            if not snap_indexes:
+                return []
+
+            snapshots = []
+            for start in range(0, len(snap_indexes), SNAPSHOT_FILTER_BATCH):
+                batch = snap_indexes[start:start + SNAPSHOT_FILTER_BATCH]
+                found = self.parent_connection._get_objects(
+                    "snapshots", full=True, sys_id=self.sys_id,
+                    filter=":or:".join("index:eq:%s" % i for i in batch))
+                if found == 1:
+                    return 1
+                snapshots.extend(found)
+            wanted = set(snap_indexes)
+            return [snap for snap in snapshots
+                    if snap.object_id in wanted]
       
         return None
 
 class XtremSSD(XtremObject):
+    __slots__ = ()
+    id_props = ("ssd-id",)
+
     @classmethod
     def is_class_for(cls, object_type):
         return object_type == "ssds"
 
-    def __init__(self, object_data, xtremio_connection):
-        XtremObject.__init__(self, object_data, xtremio_connection)
-        self.ssd_id = self.initial_object_details["ssd-id"]
+    def __init__(self, object_data, xtremio_connection, **kwargs):
+        XtremObject.__init__(self, object_data, xtremio_connection, **kwargs)
+
+    @property
+    def ssd_id(self):
+        return self.initial_object_details["ssd-id"]
 
     def __repr__(self):
         return "<XtremSSD: Cluster id: %s Drive id: %s>" % (self.sys_id, self.object_id)
 
 class XtremDAE(XtremObject):
+    __slots__ = ()
+    id_props = ("jbod-id",)
+
     @classmethod
     def is_class_for(cls, object_type):
         return object_type == "daes"
 
-    def __init__(self, object_data, xtremio_connection):
-        XtremObject.__init__(self, object_data, xtremio_connection)
-        self.jbod_id = self.initial_object_details["jbod-id"]
+    def __init__(self, object_data, xtremio_connection, **kwargs):
+        XtremObject.__init__(self, object_data, xtremio_connection, **kwargs)
+
+    @property
+    def jbod_id(self):
+        return self.initial_object_details["jbod-id"]
 
     def __repr__(self):
         return "<XtremDAE: Cluster id: %s DAE id: %s>" % (self.sys_id, self.jbod_id)
 
+    def _query_filters(self):
+        """ Filters that scope a REST request to this DAE """
+        return {"sys_id": self.sys_id,
+                "jbod_id": self.jbod_id}
+
     def _get_objects(self, object_type, **kwargs):
         """ Gathers the associated objects, with the necessary filters
         in the REST request """
 
-        return self.parent_connection._get_objects(object_type,
-                                            sys_id=self.sys_id,
-                                            jbod_id=self.jbod_id,
-                                            **kwargs) 
+        kwargs.update(self._query_filters())
+        return self.parent_connection._get_objects(object_type, **kwargs)
+
+    def iter_objects(self, object_type, **kwargs):
+        """ Streams the associated objects page by page """
+        kwargs.update(self._query_filters())
+        return self.parent_connection.iter_objects(object_type, **kwargs)
 
     @property
     def bricks(self, **kwargs):
@@ -109,62 +372,94 @@ class XtremDAE(XtremObject):
 
 
 class XtremeDAEController(XtremObject):
+    __slots__ = ()
+    id_props = ("jbod-controller-id",)
+
     @classmethod
     def is_class_for(cls, object_type):
         return object_type == "dae-controllers"
 
-    def __init__(self, object_data, xtremio_connection):
-        XtremObject.__init__(self, object_data, xtremio_connection)
-        self.controller_id = self.initial_object_details["jbod-controller-id"]
+    def __init__(self, object_data, xtremio_connection, **kwargs):
+        XtremObject.__init__(self, object_data, xtremio_connection, **kwargs)
+
+    @property
+    def controller_id(self):
+        return self.initial_object_details["jbod-controller-id"]
 
     def __repr__(self):
         return "<XtremDAEController: Cluster id: %s DAEcon id: %s>" % (self.sys_id, self.controller_id)
 
 class XtremeDAEPSU(XtremObject):
+    __slots__ = ()
+    id_props = ("jbod-psu-id",)
+
     @classmethod
     def is_class_for(cls, object_type):
         return object_type == "dae-psus"
 
-    def __init__(self, object_data, xtremio_connection):
-        XtremObject.__init__(self, object_data, xtremio_connection)
-        psu_id = self.initial_object_details["jbod-psu-id"]
+    def __init__(self, object_data, xtremio_connection, **kwargs):
+        XtremObject.__init__(self, object_data, xtremio_connection, **kwargs)
+
+    @property
+    def psu_id(self):
+        return self.initial_object_details["jbod-psu-id"]
 
     def __repr__(self):
         return "<XtremDAEPSU: Cluster id: %s DAEPSU id: %s>" % (self.sys_id, self.psu_id)
 
 class XtremeSlot(XtremObject):
+    __slots__ = ()
+    id_props = ("slot-num",)
+
     @classmethod
     def is_class_for(cls, object_type):
         return object_type == "slots"
 
-    def __init__(self, object_data, xtremio_connection):
-        XtremObject.__init__(self, object_data, xtremio_connection)
-        self.slot_num = self.initial_object_details["slot-num"]
+    def __init__(self, object_data, xtremio_connection, **kwargs):
+        XtremObject.__init__(self, object_data, xtremio_connection, **kwargs)
+
+    @property
+    def slot_num(self):
+        return self.initial_object_details["slot-num"]
 
     def __repr__(self):
         return "<XtremSlot: Cluster id: %s Slot Num: %s>" % (self.sys_id, self.slot_num)
 
     
 class XtremBrick(XtremObject):
+    __slots__ = ()
+    id_props = ("brick-id",)
+
     @classmethod
     def is_class_for(cls, object_type):
         return object_type == "bricks"
 
-    def __init__(self, object_data, xtremio_connection):
-        XtremObject.__init__(self, object_data, xtremio_connection)
-        self.brick_id = self.initial_object_details["brick-id"]
+    def __init__(self, object_data, xtremio_connection, **kwargs):
+        XtremObject.__init__(self, object_data, xtremio_connection, **kwargs)
+
+    @property
+    def brick_id(self):
+        return self.initial_object_details["brick-id"]
 
     def __repr__(self):
         return "<XtremBrick: Cluster id: %s Brick id: %s>" % (self.sys_id, self.brick_id)
 
+    def _query_filters(self):
+        """ Filters that scope a REST request to this brick """
+        return {"sys_id": self.sys_id,
+                "brick_id": self.brick_id}
+
     def _get_objects(self, object_type, **kwargs):
         """ Gathers the associated objects, with the necessary filters
         in the REST request """
 
-        return self.parent_connection._get_objects(object_type,
-                                            sys_id=self.sys_id,
-                                            brick_id=self.brick_id,
-                                            **kwargs) 
+        kwargs.update(self._query_filters())
+        return self.parent_connection._get_objects(object_type, **kwargs)
+
+    def iter_objects(self, object_type, **kwargs):
+        """ Streams the associated objects page by page """
+        kwargs.update(self._query_filters())
+        return self.parent_connection.iter_objects(object_type, **kwargs)
 
     @property 
     def ssds(self, **kwargs):
@@ -199,23 +494,32 @@ class XtremBrick(XtremObject):
         return self._get_objects("storage-controller-psus")
 
 class XtremCluster(XtremObject):
+    __slots__ = ("_topology",)
 
     @classmethod
     def is_class_for(cls, object_type):
         return object_type == "clusters"
 
-    def __init__(self, object_data, xtremio_connection):
-        XtremObject.__init__(self, object_data, xtremio_connection)
+    def __init__(self, object_data, xtremio_connection, **kwargs):
+        XtremObject.__init__(self, object_data, xtremio_connection, **kwargs)
     
     def __repr__(self):
         return "<XtremCluster: ID=%s>" % self.object_id
 
+    def _query_filters(self):
+        """ Filters that scope a REST request to this cluster """
+        return {"sys_id": self.sys_id}
+
     def _get_objects(self, object_type, **kwargs):
         """ Gathers the associated objects, with the necessary filters
         in the REST request """
-        return self.parent_connection._get_objects(object_type,
-                                            sys_id=self.sys_id,
-                                            **kwargs) 
+        kwargs.update(self._query_filters())
+        return self.parent_connection._get_objects(object_type, **kwargs)
+
+    def iter_objects(self, object_type, **kwargs):
+        """ Streams the associated objects page by page """
+        kwargs.update(self._query_filters())
+        return self.parent_connection.iter_objects(object_type, **kwargs)
 
     @property 
     def bricks(self, **kwargs):
@@ -301,18 +605,141 @@ class XtremCluster(XtremObject):
     def targetgroups(self, **kwargs):
         return self._get_objects("target-groups")
 
-def XtremObjFactory(object_type, object_data, parent_connection):
-    """ Picks the right object class for us based on the object_type """
-    for cls in XtremObject.__subclasses__():
-        if cls.is_class_for(object_type):
-            return cls(object_data, parent_connection)
- 
+    def iter_volumes(self, **kwargs):
+        return self.iter_objects("volumes", **kwargs)
+
+    def iter_snapshots(self, **kwargs):
+        return self.iter_objects("snapshots", **kwargs)
+
+    def iter_snapshotsets(self, **kwargs):
+        return self.iter_objects("snapshot-sets", **kwargs)
+
+    def iter_lunmaps(self, **kwargs):
+        return self.iter_objects("lun-maps", **kwargs)
+
+    def iter_initiators(self, **kwargs):
+        return self.iter_objects("initiators", **kwargs)
+
+    def topology(self, refresh=True):
+        """ Indexed in-memory model of this cluster's volumes, snapshots,
+            lun maps, initiators and groups for topology queries.  Built
+            with one bulk load on first use, then refreshed incrementally
+            unless refresh is False.  Returns 1 if the load or refresh
+            failed, keeping the model to be caught up on the next call """
+        if getattr(self, "_topology", None) is None:
+            self._topology = xtremTopologyLib.XtremTopology(self.parent_connection,
+                                                            self)
+        elif refresh:
+            self._topology.refresh()
+        if self._topology.sync.failed:
+            return 1
+        return self._topology
+
+    def hot_volumes(self, n=10, metric="iops", props=HOT_VOLUME_PROPS):
+        """ The n volumes with the highest value of metric, busiest first.
+            All volumes are swept with one bulk request per page, projected
+            to props, and ranked with a heap so only n are kept.  Returns 1
+            if the sweep could not be completed """
+        props = list(props)
+        if metric not in props:
+            props.append(metric)
+
+        def value(volume):
+            try:
+                return float(volume.initial_object_details.get(metric) or 0)
+            except (TypeError, ValueError):
+                return 0.0
+
+        try:
+            return heapq.nlargest(n, self.iter_objects("volumes", full=True,
+                                                       prop=props),
+                                  key=value)
+        except requests.exceptions.RequestException as e:
+            print "Error:",e
+            return 1
+
+def _subclasses(cls):
+    """ All subclasses of cls, nested ones included.  Subclasses come
+        before their parents, so a specialised class claiming the same
+        type as the class it extends is the one used """
+    found = []
+    for sub in cls.__subclasses__():
+        found.extend(_subclasses(sub))
+        found.append(sub)
+    return found
+
+def registerObjectClass(object_type, cls):
+    """ Makes XtremObjFactory build objects of object_type as cls, taking
+        precedence over the built in classes """
+    with _classes_lock:
+        _registered_classes[object_type] = cls
+        _resolved_classes.clear()
+
+def objectClassFor(object_type):
+    """ Returns the class used for object_type, resolved once per type """
+    cls = _resolved_classes.get(object_type)
+    if cls is None:
+        cls = _registered_classes.get(object_type)
+        if cls is None:
+            for sub in _subclasses(XtremObject):
+                if sub.is_class_for(object_type):
+                    cls = sub
+                    break
+            else:
+                cls = XtremObject
+        with _classes_lock:
+            _resolved_classes[object_type] = cls
+    return cls
+
+def XtremObjFactory(object_type, object_data, parent_connection, **kwargs):
+    """ Picks the right object class for us based on the object_type,
+        a plain XtremObject for types without a class of their own """
+    return objectClassFor(object_type)(object_data, parent_connection, **kwargs)
+
 class XtremIO:
-    def __init__(self,ip,user,pwd):
-        """ Constructor, store user, pass, and IP address """
+    def __init__(self,ip,user,pwd,lazy=False,bulk=False,props=None,
+                 workers=1,max_concurrency=None,cache_ttl=None,
+                 cache_size=xtremCacheLib.DEFAULT_MAX_ENTRIES,page_size=None,
+                 stream_json=False,adaptive=False,compact=False,timeout=None):
+        """ Constructor, store user, pass, and IP address.  With lazy set,
+            objects are returned without fetching their details up front.
+            With bulk set, collections are listed with full=1 so details
+            come back with the list, optionally projected to the property
+            list given for that object type in props.  With workers above
+            one, object details are fetched concurrently, with at most
+            max_concurrency requests in flight against this XMS.  With
+            cache_ttl set, list and detail responses are cached for that
+            many seconds, and dropped when xtremOperationsLib changes
+            objects of the same type.  page_size limits the number of
+            objects asked for per list request.  With stream_json set,
+            list responses are parsed incrementally from the byte stream
+            rather than loaded whole (such responses are not cached).
+            With adaptive set, the concurrency limit follows what the XMS
+            can sustain, cut when it slows down or returns 5xx and raised
+            again while it keeps up, up to max_concurrency.  With compact
+            set, object details are packed into a schema shared by all
+            objects of a type, cutting the memory of large collections.
+            timeout, in seconds or as a (connect, read) pair, replaces the
+            default timeout of requests to this XMS """
         self.user = user
         self.pwd = pwd
         self.ip = ip
+        self.lazy = lazy
+        self.bulk = bulk
+        self.props = props or dict()
+        self.workers = workers
+        self.page_size = page_size
+        self.stream_json = stream_json
+        self.compact = compact
+        if adaptive:
+            xtremParallelLib.setAdaptiveConcurrency(self.ip,
+                max_limit=max_concurrency or xtremParallelLib.DEFAULT_CONCURRENCY_LIMIT)
+        elif max_concurrency is not None:
+            xtremParallelLib.setConcurrencyLimit(self.ip, max_concurrency)
+        if cache_ttl:
+            xtremCacheLib.enableCache(self.ip, cache_ttl, cache_size)
+        if timeout is not None:
+            xtremRequestLib.setTimeout(self.ip, timeout)
         self.api_endpoint = 'https://%s/api/json/v2/types/' % self.ip
 
         self.clusters = self._get_objects("clusters")
@@ -322,9 +749,83 @@ class XtremIO:
         """  repr:  <XtremIO IP: <IP ADDR> > """
         return "<XtremIO IP: %s>" % self.ip
 
-    def _get_objects(self, object_type, **kwargs):
+    def connection_stats(self):
+        """ Returns connection reuse statistics for this XMS """
+        return xtremSessionLib.getSessionStats(self.ip).get(self.ip, dict())
+
+    def concurrency_stats(self):
+        """ Returns the in-flight request counters for this XMS """
+        return xtremParallelLib.getLimiter(self.ip).stats()
+
+    def request_metrics(self):
+        """ Returns request counts, latencies, sizes and errors per
+            endpoint of this XMS """
+        return xtremMetricsLib.getMetrics(self.ip).get(self.ip, dict())
+
+    def cache_stats(self):
+        """ Returns the cache hit/miss counters for this XMS """
+        cache = xtremCacheLib.getCache(self.ip)
+        if cache is None:
+            return dict()
+        return cache.stats()
+
+    def invalidate_cache(self, *object_types):
+        """ Drops cached responses for the given object types, or all """
+        xtremCacheLib.invalidate(self.ip, *object_types)
+
+    def _get_json(self, url, params):
+        """ GETs url through the request pipeline and returns the decoded
+            JSON, answered from the cache when caching is enabled """
+        response = xtremRequestLib.request(self.ip, self.user, self.pwd,
+                                           'get', url, params=params)
+        return json.loads(response.text)
+
+    def _get_objects(self, object_type, full=None, prop=None, **kwargs):
         """ Gathers requested objects of object_type from array 
-            Returning a list of XtremObjects """
+            Returning a list of XtremObjects 
+
+            With full set the details of every object are requested in
+            the list call (one request per page rather than one per
+            object), projected to the properties in prop if given """
+        return_objects = []
+        try:
+            for page in self._iter_object_pages(object_type, full, prop,
+                                                kwargs):
+                return_objects.extend(page)
+        except requests.exceptions.RequestException as e:
+            print "Error:",e
+            return 1
+
+        return return_objects
+
+    def iter_objects(self, object_type, full=None, prop=None, **kwargs):
+        """ Yields XtremObjects of object_type as each page of the list
+            arrives, so memory stays flat regardless of collection size.
+            Takes the same arguments as _get_objects.  A request failing
+            part way raises its requests.exceptions.RequestException, so a
+            truncated sweep is never mistaken for a complete one """
+        for page in self._iter_object_pages(object_type, full, prop,
+                                            kwargs):
+            for obj in page:
+                yield obj
+
+    def _iter_object_pages(self, object_type, full, prop, kwargs):
+        """ Yields a list of XtremObjects for each page of the list
+            response, following the next links """
+        lazy = kwargs.pop("lazy", self.lazy)
+        workers = kwargs.pop("workers", self.workers)
+        sys_id = kwargs.get("sys_id")
+        if full is None:
+            full = self.bulk
+        if prop is None:
+            prop = self.props.get(object_type)
+
+        # Objects are built lazily and their details gathered afterwards
+        # on the worker pool when fetching in parallel
+        prefetch = not full and not lazy and workers > 1
+        if prefetch:
+            lazy = True
+
         params = dict()
         if kwargs:
             for key, val in kwargs.items():
@@ -333,25 +834,71 @@ class XtremIO:
                     params[new_key] = val
                 else:
                     params[key] = val
-        try:  
-            response = requests.get(self.api_endpoint + object_type, 
-                                    auth=(self.user,self.pwd), 
-                                    params=params, verify=False)
+        if full:
+            params["full"] = 1
+            if prop:
+                # name and index are needed to build the object itself,
+                # and the id fields its class reads to identify it
+                required = ["name", "index", "sys-id"] + \
+                           list(getattr(objectClassFor(object_type), "id_props", ()))
+                params["prop"] = list(prop) + [p for p in required
+                                               if p not in prop]
+        if self.page_size and "limit" not in params:
+            params["limit"] = self.page_size
+
+        url = self.api_endpoint + object_type
+        while url:
+            if self.stream_json:
+                devices = dict()
+                entries = xtremStreamLib.streamList(self.ip, self.user,
+                                                    self.pwd, url, params,
+                                                    extras=devices)
+            else:
+                devices = self._get_json(url, params)
+                entries = self._list_entries(devices)
+
+            page = []
+            for j in entries:
+                if full:
+                    page.append(self._bulk_object(object_type, j, sys_id))
+                else:
+                    page.append(XtremObjFactory(object_type,j,self,
+                                                sys_id=sys_id,
+                                                lazy=lazy))
 
-            devices = json.loads(response.text)
+            if prefetch:
+                xtremParallelLib.parallelMap(lambda o: o.initial_object_details,
+                                             page, workers, ip=self.ip)
+            yield page
 
-        except requests.exceptions.RequestException as e:
-            print "Error:",e
-            return 1
+            # The next link already carries the query string
+            url = self._next_link(devices)
+            params = None
 
-        return_objects = []
+    def _list_entries(self, devices):
+        """ Yields the entries of a decoded list response """
         for i in devices.keys():
             if i == u"links":
                 continue 
             for j in devices[i]:
-                return_objects.append(XtremObjFactory(object_type,j,self))
-
-        return return_objects
+                yield j
+
+    def _bulk_object(self, object_type, entry, sys_id=None):
+        """ Builds an XtremObject from a full=1 list entry, which holds
+            the object details rather than a name/href pair """
+        href = entry.get("href")
+        if href is None:
+            href = "%s%s/%s" % (self.api_endpoint, object_type, entry["index"])
+        object_data = {"name": entry.get("name"), "href": href}
+        return XtremObjFactory(object_type, object_data, self,
+                               sys_id=sys_id, details=entry)
+
+    def _next_link(self, devices):
+        """ Returns the href of the next page of a list response, if any """
+        for link in devices.get(u"links", []):
+            if link.get(u"rel") == u"next":
+                return link.get(u"href")
+        return None
 
     def _get_details(self, device_object, **kwargs):
         """ Gathers details of a specific object, returning a 
@@ -366,10 +913,7 @@ class XtremIO:
                     params[key] = val
 
         try:  
-            response = requests.get(device_object.href,
-                                    auth=(self.user,self.pwd), 
-                                    params=params, verify=False)
-            info = json.loads(response.text)
+            info = self._get_json(device_object.href, params)
             return info["content"]
         except requests.exceptions.RequestException as e:
             print "Error:",e
@@ -1,66 +1,35 @@
 import requests, json, sys
 import requests.packages.urllib3
+import xtremRequestLib
+import xtremPerfLib
 
 requests.packages.urllib3.disable_warnings()
 
 def getXenvs(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/xenvs/' %(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/xenvs/' %(ip))
 
 def getXenvUtil(ip,name,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/xenvs/?name=%s' %(ip,name),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return json.loads(response.text)['content']['cpu-usage']
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/xenvs/?name=%s' %(ip,name),'cpu-usage')
 
 def getVolumeReadLatency(ip,name,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/volumes/?name=%s' %(ip,name),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return json.loads(response.text)['content']['rd-latency']
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/volumes/?name=%s' %(ip,name),'rd-latency')
 
 def getVolumeWriteLatency(ip,name,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/volumes/?name=%s' %(ip,name),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return json.loads(response.text)['content']['wr-latency']
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/volumes/?name=%s' %(ip,name),'wr-latency')
 
 def getVolumeIops(ip,name,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/volumes/?name=%s' %(ip,name),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return json.loads(response.text)['content']['iops']
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/volumes/?name=%s' %(ip,name),'iops')
 
 def getVolumeReadBandwidth(ip,name,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/volumes/?name=%s' %(ip,name),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return json.loads(response.text)['content']['rd-bw']
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/volumes/?name=%s' %(ip,name),'rd-bw')
 
 def getVolumeWriteBandwidth(ip,name,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/volumes/?name=%s' %(ip,name),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return json.loads(response.text)['content']['wr-bw']
\ No newline at end of file
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/volumes/?name=%s' %(ip,name),'wr-bw')
+
+def getVolumeMetrics(ip,name,user,pwd,metrics=xtremPerfLib.VOLUME_METRICS):
+    """ Returns {metric:value} for all requested metrics of a volume from
+        one request, instead of one request per getVolume* call """
+    record = xtremPerfLib.sampleMetrics(ip,user,pwd,'volumes',metrics,names=[name])
+    if not isinstance(record, dict):
+        return record
+    return record['samples'].get(name)
\ No newline at end of file
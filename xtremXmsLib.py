@@ -1,84 +1,39 @@
 import requests, json, sys
 import requests.packages.urllib3
+import xtremRequestLib
+import xtremPerfLib
 
 requests.packages.urllib3.disable_warnings()
 
 def getXms(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/xms/?name=xms' %(ip),auth=(user,pwd),verify=False)
-        return json.loads(response.text)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
+    return xtremRequestLib.getJson(ip,user,pwd,'https://%s/api/json/v2/types/xms/?name=xms' %(ip))
 
 def getXmsReadlatency(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return json.loads(response.text)['content']['rd-latency']
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),'rd-latency')
 
 def getXmsWritelatency(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return json.loads(response.text)['content']['wr-latency']
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),'wr-latency')
 
 def getXmsReadBandwidth(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return float(json.loads(response.text)['content']['rd-bw'])/1000
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),'rd-bw',scale=1000)
 
 def getXmsWriteBandwidth(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return float(json.loads(response.text)['content']['wr-bw'])/1000
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),'wr-bw',scale=1000)
 
 def getXmsBandwidth(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return float(json.loads(response.text)['content']['bw'])/1000
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),'bw',scale=1000)
 
 def getXmsReadIops(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return json.loads(response.text)['content']['rd-iops']
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),'rd-iops')
 
 def getXmsWriteIops(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return json.loads(response.text)['content']['wr-iops']
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),'wr-iops')
 
 def getXmsIops(ip,user,pwd):
-    try:
-        response = requests.get('https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),auth=(user,pwd),verify=False)
-    except requests.exceptions.RequestException as e:
-        print "Error:",e
-        return 1
-    if response.status_code == 200:
-       return json.loads(response.text)['content']['iops']
\ No newline at end of file
+    return xtremRequestLib.getContentField(ip,user,pwd,'https://%s/api/json/v2/types/xenvs/?name=xms' %(ip),'iops')
+
+def getXmsMetrics(ip,user,pwd,metrics=xtremPerfLib.XMS_METRICS):
+    """ Returns {metric:value} for all requested metrics from one request,
+        instead of one request per getXms* call.  Values are as returned
+        by the array, bandwidths are not scaled """
+    return xtremPerfLib.sampleXms(ip,user,pwd,metrics)
\ No newline at end of file